@@ -0,0 +1,55 @@
+# Benchmark: matriz de correlação do heatmap do dashboard, carga das colunas x momentos.
+#
+# Para cada tamanho de tabela sintética, com os agregados da ingestão, mede num
+# processo novo o tempo e o acréscimo do pico de RSS de:
+#   carregar - data/Armazenamento.carregar das colunas + DataFrame.corr() (caminho anterior)
+#   momentos - data/Correlacao.correlacao, lida da linha da tabela momentos
+# e confere que as duas matrizes coincidem.
+#
+# Uso: python -m benchmarks.bench_correlacao [--tamanhos 100000 1000000]
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.comum import medir_em_processo, preparar_banco, rss_maximo_mb
+from data.Agregados import COLUNAS_MOMENTOS
+
+
+def _medir(caminho):
+    # Processo novo, que herda SHOPPING_DB
+    from data.Armazenamento import carregar
+    from data.Correlacao import correlacao
+
+    rss_antes = rss_maximo_mb()
+    inicio = time.perf_counter()
+    if caminho == 'carregar':
+        matriz = carregar(colunas=COLUNAS_MOMENTOS).astype('float64').corr()
+    else:
+        matriz = correlacao(COLUNAS_MOMENTOS)
+    return (time.perf_counter() - inicio) * 1000, rss_maximo_mb() - rss_antes, matriz.to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--db', default='/tmp/bench_correlacao.db')
+    args = parser.parse_args()
+
+    os.environ['SHOPPING_DB'] = args.db
+    for linhas in args.tamanhos:
+        preparar_banco(args.db, linhas).close()
+
+        matrizes = {}
+        for caminho in ('carregar', 'momentos'):
+            tempo, rss, matrizes[caminho] = medir_em_processo(_medir, caminho)
+            print(f"{linhas:>12,} linhas  {caminho:<9} {tempo:9.1f} ms  +{rss:7.1f} MB RSS")
+
+        diferenca = np.nanmax(np.abs(matrizes['carregar'] - matrizes['momentos']))
+        assert diferenca < 1e-6, f"As matrizes divergem: {diferenca}"
+    print("OK: correlação dos momentos igual à da carga das colunas")
+
+
+if __name__ == '__main__':
+    main()
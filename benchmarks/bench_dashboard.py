@@ -0,0 +1,49 @@
+# Benchmark: motor de indicadores do Dashboard Geral.
+#
+# Para cada tamanho de tabela sintética, roda data/Indicadores.py e conta,
+# via EXPLAIN QUERY PLAN, quantas leituras da tabela shopping (SCAN ou SEARCH
+# por índice) as consultas executadas fizeram. O número precisa ser o mesmo
+# (zero) em todos os tamanhos.
+#
+# Uso: python -m benchmarks.bench_dashboard [--tamanhos 10000 100000 1000000]
+import argparse
+import os
+import time
+
+from benchmarks.comum import medir_em_processo, preparar_banco, rastrear_consultas, tabelas_lidas
+
+
+def _medir(caminho_db):
+    # Roda num processo novo, que herda SHOPPING_DB: o pool de conexões abre o banco sintético
+    from data.Indicadores import indicadoresDashboard
+
+    sqls = rastrear_consultas()
+    inicio = time.perf_counter()
+    indicadoresDashboard()
+    tempo = (time.perf_counter() - inicio) * 1000
+
+    return tempo, len(sqls), tabelas_lidas(caminho_db, sqls).count('shopping')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--db', default='/tmp/bench_dashboard.db')
+    args = parser.parse_args()
+
+    os.environ['SHOPPING_DB'] = args.db
+    resultados = []
+    for linhas in args.tamanhos:
+        preparar_banco(args.db, linhas).close()
+        tempo, consultas, leituras = medir_em_processo(_medir, args.db)
+
+        resultados.append(leituras)
+        print(f"{linhas:>12,} linhas: {tempo:8.2f} ms, {consultas} consulta(s), {leituras} leitura(s) de shopping")
+
+    assert len(set(resultados)) == 1 and resultados[0] == 0, \
+        f"O dashboard deveria fazer um número constante (zero) de leituras de shopping: {resultados}"
+    print("OK: número de leituras de shopping constante em todos os tamanhos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# Benchmark: latência dos KPIs por localização antes e depois dos índices.
+#
+# Gera uma tabela shopping sintética (10M de linhas por padrão, data/Gerador.py)
+# com o esquema declarado em data/Esquema.py, mede os KPIs de frontend/localizacao.py
+# sem índices e repete a medição depois de criar os índices e rodar ANALYZE.
+#
+# Uso: python -m benchmarks.bench_indices [--linhas 10000000] [--db /tmp/bench.db]
+import argparse
+import time
+
+from benchmarks.comum import gerar_tabela
+from data.CriacaoDB import criarIndices
+from data.Esquema import ESTADOS
+
+KPIS = [
+    'SELECT SUM(purchase_amount_usd) FROM shopping WHERE location = ?',
+    'SELECT AVG(purchase_amount_usd) FROM shopping WHERE location = ?',
+    'SELECT COUNT(*) FROM shopping WHERE location = ?',
+    'SELECT AVG(age) FROM shopping WHERE location = ?',
+    'SELECT AVG(review_rating) FROM shopping WHERE location = ?',
+    'SELECT SUM(is_subscriber) FROM shopping WHERE location = ?',
+    'SELECT category, SUM(purchase_amount_usd) FROM shopping WHERE location = ? GROUP BY category',
+]
+
+
+def medir(conn, cidades):
+    # Latência média (ms) de todos os KPIs de uma cidade
+    inicio = time.perf_counter()
+    for cidade in cidades:
+        for sql in KPIS:
+            conn.execute(sql, (cidade,)).fetchall()
+    return (time.perf_counter() - inicio) * 1000 / len(cidades)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--linhas', type=int, default=10_000_000)
+    parser.add_argument('--db', default='/tmp/bench_indices.db')
+    parser.add_argument('--cidades', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Gerando {args.linhas:,} linhas em {args.db} ...")
+    conn = gerar_tabela(args.db, args.linhas)
+    cidades = list(ESTADOS)[:args.cidades]
+
+    antes = medir(conn, cidades)
+
+    inicio = time.perf_counter()
+    criarIndices(conn.cursor())
+    conn.execute("ANALYZE")
+    criacao = time.perf_counter() - inicio
+
+    depois = medir(conn, cidades)
+    conn.close()
+
+    print(f"Criação dos índices + ANALYZE: {criacao:.1f} s")
+    print(f"KPIs por cidade sem índices: {antes:10.1f} ms")
+    print(f"KPIs por cidade com índices: {depois:10.1f} ms")
+    print(f"Ganho: {antes / depois:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
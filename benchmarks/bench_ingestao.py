@@ -0,0 +1,66 @@
+# Benchmark: ingestão de um diretório de CSVs com 1, 2, 4 e 8 processos.
+#
+# Gera um diretório com um CSV sintético por loja/dia (data/Gerador.py, cabeçalho
+# igual ao do dataset original) e mede, para cada número de processos, a vazão
+# em linhas/s do preparo dos arquivos (a parte paralela) e de data.CriacaoDB.ingerirDiretorio()
+# inteiro num banco vazio, que inclui o escritor único, os índices e os agregados.
+#
+# Uso: python -m benchmarks.bench_ingestao [--arquivos 32] [--linhas 2000000]
+import argparse
+import os
+import shutil
+import time
+
+from data.CriacaoDB import arquivosEntrada, ingerirDiretorio, prepararArquivos
+from data.Gerador import aprenderModelo, gerarCsv
+
+
+def gerar_diretorio(caminho_dir, arquivos, linhas, semente=42):
+    # Um arquivo por loja/dia, cada um com sua semente e sua faixa de ids
+    shutil.rmtree(caminho_dir, ignore_errors=True)
+    os.makedirs(caminho_dir)
+    modelo = aprenderModelo()
+    por_arquivo = linhas // arquivos
+    for numero in range(arquivos):
+        gerarCsv(
+            os.path.join(caminho_dir, f"loja_{numero:03d}.csv"), por_arquivo,
+            semente=semente + numero, modelo=modelo, primeiro_id=numero * por_arquivo + 1,
+        )
+    return por_arquivo * arquivos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--arquivos', type=int, default=32)
+    parser.add_argument('--linhas', type=int, default=2_000_000)
+    parser.add_argument('--trabalhadores', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--dir', default='/tmp/bench_entrada')
+    parser.add_argument('--db', default='/tmp/bench_ingestao.db')
+    args = parser.parse_args()
+
+    print(f"Gerando {args.arquivos} arquivos ...")
+    linhas = gerar_diretorio(args.dir, args.arquivos, args.linhas)
+    print(f"{linhas:,} linhas, {os.cpu_count()} CPU(s)")
+
+    arquivos = arquivosEntrada(args.dir)
+    for trabalhadores in args.trabalhadores:
+        inicio = time.perf_counter()
+        for _, _, blocos in prepararArquivos(arquivos, f"{args.db}.blocos", trabalhadores):
+            for _ in blocos:
+                pass
+        preparo = time.perf_counter() - inicio
+
+        for sufixo in ('', '-wal', '-shm'):
+            if os.path.exists(args.db + sufixo):
+                os.remove(args.db + sufixo)
+        inicio = time.perf_counter()
+        ingerirDiretorio(args.dir, args.db, trabalhadores=trabalhadores)
+        tempo = time.perf_counter() - inicio
+        print(
+            f"{trabalhadores} processo(s): preparo {linhas / preparo:>10,.0f} linhas/s, "
+            f"ingestão completa {tempo:7.1f} s ({linhas / tempo:>9,.0f} linhas/s)"
+        )
+
+
+if __name__ == '__main__':
+    main()
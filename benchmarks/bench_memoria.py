@@ -0,0 +1,82 @@
+# Benchmark: quadro de shopping em object x compacto (Categorical, bool, int8, float32).
+#
+# Carrega as colunas da página de Promoções de uma tabela sintética com
+# data.Armazenamento.carregar, converte uma cópia para tipos compactos e compara
+# a memória do quadro (memory_usage(deep=True)) e o tempo dos groupbys que a
+# página fazia.
+#
+# Referência (1M linhas, pandas 3): 111 MB -> 28 MB e groupbys ~1,7x mais
+# rápidos; a conversão custa ~1 s.
+#
+# Uso: python -m benchmarks.bench_memoria [--linhas 1000000]
+import argparse
+import os
+import time
+
+import pandas as pd
+
+COLUNAS_PROMOCOES = [
+    'customer_id', 'category', 'purchase_amount_usd', 'season', 'review_rating',
+    'subscription_status', 'discount_applied', 'previous_purchases',
+    'preferred_payment_method', 'frequency_of_purchases',
+]
+
+
+def _compactar(df):
+    # Textos viram Categorical, Yes/No viram bool e os números são reduzidos
+    df = df.copy()
+    for coluna in df.columns:
+        if df[coluna].dtype == 'float64':
+            df[coluna] = df[coluna].astype('float32')
+        elif pd.api.types.is_integer_dtype(df[coluna]):
+            df[coluna] = pd.to_numeric(df[coluna], downcast='integer')
+        elif set(df[coluna].dropna().unique()) <= {'Yes', 'No'}:
+            df[coluna] = df[coluna] == 'Yes'
+        else:
+            df[coluna] = df[coluna].astype('category')
+    return df
+
+
+def _groupbys(df, sim):
+    # Os mesmos agrupamentos de frontend/promocoes.py
+    com_desconto = df[df['discount_applied'] == sim]
+    df.groupby(['subscription_status', 'frequency_of_purchases'], observed=True).size()
+    com_desconto.groupby('season', observed=True).size()
+    com_desconto.groupby('category', observed=True)['review_rating'].mean()
+    df['preferred_payment_method'].value_counts()
+
+
+def _medir(df, sim, repeticoes=5):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        _groupbys(df, sim)
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--linhas', type=int, default=1_000_000)
+    parser.add_argument('--db', default='/tmp/bench_memoria.db')
+    args = parser.parse_args()
+
+    os.environ['SHOPPING_DB'] = args.db
+    from benchmarks.comum import gerar_tabela
+    from data.Armazenamento import carregar
+
+    print(f"Gerando {args.linhas:,} linhas ...")
+    gerar_tabela(args.db, args.linhas).close()
+
+    inicio = time.perf_counter()
+    df = carregar(COLUNAS_PROMOCOES)
+    carga = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    compacto = _compactar(df)
+    conversao = time.perf_counter() - inicio
+
+    for nome, quadro, sim, tempo in (('object', df, 'Yes', carga), ('compacto', compacto, True, carga + conversao)):
+        memoria = quadro.memory_usage(deep=True).sum() / 2**20
+        print(f"{nome:<9} {memoria:8.1f} MB  carga {tempo:6.2f} s  groupbys {_medir(quadro, sim):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
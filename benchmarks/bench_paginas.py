@@ -0,0 +1,154 @@
+# Benchmark: as quatro páginas do app, sem navegador, em vários tamanhos de tabela.
+#
+# Para cada tamanho, gera uma tabela sintética (data/Gerador.py) com os índices e
+# os agregados da ingestão e roda cada página com o AppTest do Streamlit, num
+# processo novo por página. Mede:
+#   frio_ms        - primeira execução, com os caches de resultados e figuras vazios
+#   rerun_ms       - rerun depois de uma interação típica (outra cidade, outro filtro)
+#   consultas      - SELECTs que chegaram ao SQLite nas duas execuções
+#   passos_vm      - instruções da VM do SQLite para executar esses SELECTs de
+#                    novo: cresce com as linhas lidas, por SCAN ou por índice
+#   rss_mb         - acréscimo do pico de RSS do processo
+#
+# Os resultados podem ser gravados como baseline JSON (--salvar) e comparados com
+# ela nas execuções seguintes: a execução falha (código 1) quando alguma métrica
+# piora além de --limite (fração) e da folga absoluta da métrica.
+#
+# Uso: python -m benchmarks.bench_paginas [--tamanhos 10000 100000] [--salvar]
+#                                         [--baseline benchmarks/baselines/paginas.json] [--limite 0.25]
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.comum import (
+    medir_em_processo,
+    passos_vm,
+    preparar_banco,
+    rastrear_consultas,
+    rss_maximo_mb,
+)
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGINAS = {
+    'dashboard': 'frontend/dashboard.py',
+    'localizacao': 'frontend/localizacao.py',
+    'consumidor': 'frontend/consumidor.py',
+    'promocoes': 'frontend/promocoes.py',
+}
+
+# Interação antes do rerun; páginas sem widget só rodam de novo
+INTERACOES = {
+    'localizacao': lambda at: at.selectbox[0].select(at.selectbox[0].options[-1]),
+    'consumidor': lambda at: at.slider[0].set_value((25, 45)),
+}
+
+# Folga absoluta por métrica: diferenças menores que ela nunca contam como regressão
+FOLGAS = {
+    'frio_ms': 50.0,
+    'rerun_ms': 20.0,
+    'consultas': 0,
+    'passos_vm': 0,
+    'rss_mb': 10.0,
+}
+
+
+def _medir(pagina, caminho_db):
+    # Processo novo, que herda SHOPPING_DB: caches vazios e pico de RSS só desta página
+    from streamlit.testing.v1 import AppTest
+
+    sqls = rastrear_consultas()
+    rss_antes = rss_maximo_mb()
+    app = AppTest.from_file(os.path.join(RAIZ, PAGINAS[pagina]), default_timeout=600)
+
+    inicio = time.perf_counter()
+    app.run()
+    frio = (time.perf_counter() - inicio) * 1000
+    erros = [erro.value for erro in app.exception]
+
+    interagir = INTERACOES.get(pagina)
+    if interagir is not None and not erros:
+        interagir(app)
+    inicio = time.perf_counter()
+    app.run()
+    rerun = (time.perf_counter() - inicio) * 1000
+    erros += [erro.value for erro in app.exception]
+
+    selects = [sql for sql in sqls if sql.lstrip().upper().startswith(('SELECT', 'WITH'))]
+    return {
+        'frio_ms': round(frio, 1),
+        'rerun_ms': round(rerun, 1),
+        'consultas': len(selects),
+        'passos_vm': passos_vm(caminho_db, selects),
+        'rss_mb': round(rss_maximo_mb() - rss_antes, 1),
+        'erros': erros,
+    }
+
+
+def _regressoes(resultados, baseline, limite):
+    problemas = []
+    for tamanho, paginas in resultados.items():
+        for pagina, metricas in paginas.items():
+            anterior = baseline.get(tamanho, {}).get(pagina)
+            if anterior is None:
+                continue
+            for metrica, folga in FOLGAS.items():
+                novo, base = metricas[metrica], anterior.get(metrica)
+                if base is None:
+                    continue
+                if novo > base * (1 + limite) and novo - base > folga:
+                    problemas.append(f"{pagina} ({tamanho} linhas) {metrica}: {base} -> {novo}")
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--paginas', nargs='+', choices=list(PAGINAS), default=list(PAGINAS))
+    parser.add_argument('--db', default='/tmp/bench_paginas.db')
+    parser.add_argument('--baseline', default=os.path.join(RAIZ, 'benchmarks', 'baselines', 'paginas.json'))
+    parser.add_argument('--limite', type=float, default=0.25)
+    parser.add_argument('--salvar', action='store_true', help='grava os resultados como a nova baseline')
+    args = parser.parse_args()
+
+    os.environ['SHOPPING_DB'] = args.db
+    resultados = {}
+    falhas = []
+    for linhas in args.tamanhos:
+        print(f"Gerando {linhas:,} linhas ...")
+        preparar_banco(args.db, linhas).close()
+        resultados[str(linhas)] = {}
+        for pagina in args.paginas:
+            metricas = medir_em_processo(_medir, pagina, args.db)
+            if metricas.pop('erros'):
+                falhas.append(f"{pagina} ({linhas} linhas) levantou exceção")
+            resultados[str(linhas)][pagina] = metricas
+            print(
+                f"  {pagina:<12} frio {metricas['frio_ms']:9.1f} ms  rerun {metricas['rerun_ms']:8.1f} ms  "
+                f"{metricas['consultas']:3d} consulta(s)  {metricas['passos_vm']:>12,} passos da VM  "
+                f"+{metricas['rss_mb']:7.1f} MB RSS"
+            )
+
+    if args.salvar:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as arquivo:
+            json.dump(resultados, arquivo, indent=2, sort_keys=True)
+        print(f"Baseline gravada em {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as arquivo:
+            falhas += _regressoes(resultados, json.load(arquivo), args.limite)
+    else:
+        print(f"Sem baseline em {args.baseline}; use --salvar para gravar uma")
+
+    if falhas:
+        print("REGRESSÃO:")
+        for falha in falhas:
+            print(f"  {falha}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# Benchmark: carga das colunas da página de Promoções, SQLite x Parquet.
+#
+# Gera uma tabela sintética, exporta o dataset Parquet particionado e, para cada
+# backend, mede num processo novo o tempo de data.Armazenamento.carregar() e o
+# acréscimo de RSS máximo que a carga provoca.
+#
+# Uso: python -m benchmarks.bench_parquet [--linhas 2000000]
+import argparse
+import os
+import time
+
+from benchmarks.comum import medir_em_processo, preparar_banco, rss_maximo_mb
+from data.CriacaoDB import escreverParquet
+
+COLUNAS_PROMOCOES = [
+    'customer_id', 'category', 'purchase_amount_usd', 'season', 'review_rating',
+    'subscription_status', 'discount_applied', 'previous_purchases',
+    'preferred_payment_method', 'frequency_of_purchases',
+]
+
+
+def _medir(backend, colunas, filtros):
+    # Processo novo, que herda SHOPPING_DB / SHOPPING_PARQUET
+    from data.Armazenamento import carregar
+
+    rss_antes = rss_maximo_mb()
+    inicio = time.perf_counter()
+    df = carregar(colunas, filtros, backend=backend)
+    tempo = time.perf_counter() - inicio
+    return tempo, rss_maximo_mb() - rss_antes, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--linhas', type=int, default=2_000_000)
+    parser.add_argument('--db', default='/tmp/bench_parquet.db')
+    parser.add_argument('--parquet', default='/tmp/bench_parquet')
+    args = parser.parse_args()
+
+    print(f"Gerando {args.linhas:,} linhas ...")
+    conn = preparar_banco(args.db, args.linhas, agregados=False)
+    inicio = time.perf_counter()
+    escreverParquet(conn, args.parquet)
+    print(f"Exportação Parquet: {time.perf_counter() - inicio:.1f} s")
+    conn.close()
+
+    tamanho_db = os.path.getsize(args.db) / 2**20
+    tamanho_parquet = sum(
+        os.path.getsize(os.path.join(pasta, nome))
+        for pasta, _, nomes in os.walk(args.parquet) for nome in nomes
+    ) / 2**20
+    print(f"Tamanho em disco: SQLite {tamanho_db:.0f} MB, Parquet {tamanho_parquet:.0f} MB")
+
+    os.environ['SHOPPING_DB'] = args.db
+    os.environ['SHOPPING_PARQUET'] = args.parquet
+    cenarios = [
+        ('promoções (10 colunas)', COLUNAS_PROMOCOES, []),
+        ('heatmap (3 colunas)', ['age', 'purchase_amount_usd', 'review_rating'], []),
+        ('1 cidade, 2 colunas', ['age', 'purchase_amount_usd'], [('location', '=', 'Texas')]),
+    ]
+    for nome, colunas, filtros in cenarios:
+        for backend in ('sqlite', 'parquet'):
+            tempo, rss, linhas = medir_em_processo(_medir, backend, colunas, filtros)
+            print(f"{nome:<24} {backend:<8} {tempo:7.2f} s  +{rss:7.0f} MB RSS  {linhas:,} linhas")
+
+
+if __name__ == '__main__':
+    main()
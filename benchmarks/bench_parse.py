@@ -0,0 +1,90 @@
+# Benchmark: leitura do CSV, leitor original x leitor guiado pelo esquema.
+#
+# Gera CSVs sintéticos de dois tamanhos (data/Gerador.py) com o cabeçalho do
+# dataset original e mede, num processo novo para cada leitor, o tempo e o
+# pico de RSS de:
+#   original - pd.read_csv do arquivo inteiro com inferência de tipos + astype
+#   c        - data.CriacaoDB.lerBlocos com dtype/usecols do esquema (pandas)
+#   pyarrow  - o mesmo, com SHOPPING_MOTOR_CSV=pyarrow
+# Os leitores em blocos precisam ter memória limitada: a execução falha se o
+# pico de RSS de c ou pyarrow crescer do tamanho menor para o maior além de
+# --tolerancia (fração) mais FOLGA_MB.
+#
+# Uso: python -m benchmarks.bench_parse [--linhas 500000 3000000] [--csv /tmp/bench_parse.csv]
+#                                       [--tolerancia 0.2]
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks.comum import medir_em_processo, rss_maximo_mb
+from data.Gerador import gerarCsv
+
+# Folga absoluta do pico de RSS entre os tamanhos (alocador, cache de páginas do Python)
+FOLGA_MB = 16
+
+
+def _original(caminho):
+    # O leitor anterior ao esquema declarado
+    from data.CriacaoDB import normalizarColuna
+
+    df = pd.read_csv(caminho, sep=',', encoding='utf-8')
+    df.columns = [normalizarColuna(coluna) for coluna in df.columns]
+    df = df.dropna()
+    df['age'] = df['age'].astype(int)
+    df['purchase_amount_usd'] = df['purchase_amount_usd'].astype(float)
+    df['review_rating'] = df['review_rating'].astype(float)
+    df['previous_purchases'] = df['previous_purchases'].astype(int)
+    return len(df)
+
+
+def _esquema(caminho):
+    from data.CriacaoDB import lerBlocos
+
+    return sum(len(bloco) for bloco in lerBlocos(caminho))
+
+
+def _medir(leitor, caminho):
+    rss_antes = rss_maximo_mb()
+    inicio = time.perf_counter()
+    linhas = (_original if leitor == 'original' else _esquema)(caminho)
+    return time.perf_counter() - inicio, rss_maximo_mb() - rss_antes, linhas
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--linhas', type=int, nargs=2, default=[500_000, 3_000_000])
+    parser.add_argument('--csv', default='/tmp/bench_parse.csv')
+    parser.add_argument('--tolerancia', type=float, default=0.2)
+    args = parser.parse_args()
+
+    picos = {}
+    for linhas in sorted(args.linhas):
+        print(f"Gerando {linhas:,} linhas ...")
+        gerarCsv(args.csv, linhas)
+        print(f"CSV: {os.path.getsize(args.csv) / 2**20:.0f} MB")
+
+        for leitor in ('original', 'c', 'pyarrow'):
+            os.environ['SHOPPING_MOTOR_CSV'] = 'pyarrow' if leitor == 'pyarrow' else 'c'
+            tempo, rss, lidas = medir_em_processo(_medir, leitor, args.csv)
+            picos.setdefault(leitor, []).append(rss)
+            print(f"  {leitor:<9} {tempo:7.2f} s  +{rss:7.0f} MB RSS  {lidas:,} linhas")
+
+    crescimentos = [
+        f"{leitor}: {menor:.0f} -> {maior:.0f} MB"
+        for leitor in ('c', 'pyarrow')
+        for menor, maior in [picos[leitor]]
+        if maior > menor * (1 + args.tolerancia) + FOLGA_MB
+    ]
+    if crescimentos:
+        print("REGRESSÃO: o pico de RSS cresce com o tamanho do CSV")
+        for crescimento in crescimentos:
+            print(f"  {crescimento}")
+        sys.exit(1)
+    print("OK: pico de RSS dos leitores em blocos estável entre os tamanhos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# Benchmark: página de Promoções, máscaras sobre o quadro x motor de segmentos.
+#
+# Gera uma tabela sintética e mede, num processo novo para cada caminho, o tempo
+# da primeira execução (cache frio), o de um rerun (cache de resultados quente)
+# e o acréscimo de RSS máximo de calcular os números da página:
+#   quadro    - carregar() das colunas da página + cópias por máscara e um
+#               groupby/mean/nunique por medida (o caminho anterior)
+#   segmentos - data.Segmentos.compararSegmentos() para as divisões da página,
+#               lida da tabela segmentos dos agregados da ingestão
+#
+# Uso: python -m benchmarks.bench_segmentos [--linhas 2000000]
+import argparse
+import os
+import time
+
+from benchmarks.comum import medir_em_processo, preparar_banco, rss_maximo_mb
+
+COLUNAS_PROMOCOES = [
+    'customer_id', 'category', 'purchase_amount_usd', 'season', 'review_rating',
+    'is_subscriber', 'has_discount', 'previous_purchases',
+    'preferred_payment_method', 'frequency_of_purchases',
+]
+
+
+def _quadro():
+    from data.Armazenamento import carregar
+
+    df = carregar(COLUNAS_PROMOCOES)
+    com, sem = df[df['has_discount'] == 1], df[df['has_discount'] == 0]
+    assinantes, outros = df[df['is_subscriber'] == 1], df[df['is_subscriber'] == 0]
+    df.groupby(['is_subscriber', 'frequency_of_purchases'], observed=True).size()
+    for grupo in (com, sem):
+        grupo['purchase_amount_usd'].mean()
+        grupo['customer_id'].nunique()
+        grupo['review_rating'].mean()
+        grupo['previous_purchases'].mean()
+        grupo.groupby('season', observed=True).size()
+        grupo.groupby('category', observed=True)['review_rating'].mean()
+    for grupo in (assinantes, outros):
+        grupo['preferred_payment_method'].value_counts()
+    df['preferred_payment_method'].value_counts()
+    df['has_discount'].value_counts(normalize=True)
+
+
+def _segmentos():
+    from data.Segmentos import compararSegmentos
+
+    desconto = compararSegmentos('desconto', ('season', 'category'))
+    assinatura = compararSegmentos(
+        'assinatura', ('frequency_of_purchases', 'preferred_payment_method'), contar_clientes=False
+    )
+    desconto.resumo()
+    desconto.por('season')
+    desconto.mediaPor('category', 'soma_avaliacao')
+    assinatura.por('frequency_of_purchases')
+    assinatura.por('preferred_payment_method')
+
+
+def _medir(caminho):
+    calcular = _quadro if caminho == 'quadro' else _segmentos
+    rss_antes = rss_maximo_mb()
+    inicio = time.perf_counter()
+    calcular()
+    frio = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    calcular()
+    quente = time.perf_counter() - inicio
+    return frio, quente, rss_maximo_mb() - rss_antes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--linhas', type=int, default=2_000_000)
+    parser.add_argument('--db', default='/tmp/bench_segmentos.db')
+    args = parser.parse_args()
+
+    print(f"Gerando {args.linhas:,} linhas ...")
+    preparar_banco(args.db, args.linhas).close()
+
+    # Os processos novos herdam o banco e o backend pelas variáveis de ambiente
+    os.environ['SHOPPING_DB'] = args.db
+    for caminho in ('quadro', 'segmentos'):
+        frio, quente, rss = medir_em_processo(_medir, caminho)
+        print(f"{caminho:<10} 1ª vez {frio:7.2f} s  rerun {quente * 1000:8.1f} ms  +{rss:7.0f} MB RSS")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# Peças compartilhadas pelos benchmarks:
+#   gerar_tabela       - tabela shopping sintética (data/Gerador.py), sem índices
+#   preparar_banco     - a mesma tabela como a ingestão a deixa: índices,
+#                        agregados e ANALYZE
+#   medir_em_processo  - roda uma função num processo novo (spawn) e devolve o
+#                        resultado: caches vazios e pico de RSS só da medição
+#   rss_maximo_mb      - pico de RSS do processo
+#   rastrear_consultas - SQL executado pela conexão do pool (data/Conexao.py)
+#   tabelas_lidas      - tabelas que o plano (EXPLAIN QUERY PLAN) das consultas
+#                        rastreadas lê, por SCAN ou por SEARCH num índice
+#   passos_vm          - instruções da VM do SQLite ao executar as consultas de
+#                        novo: o trabalho de fato, que cresce com as linhas lidas
+import multiprocessing
+import os
+import re
+import resource
+import sqlite3
+
+from data.Agregados import atualizarAgregados
+from data.CriacaoDB import criarIndices, criarTabelaShopping, inserirBlocos
+from data.Esquema import derivarColunas
+from data.Gerador import gerarBlocos
+
+_LEITURA = re.compile(r'^(?:SCAN|SEARCH) (\w+)')
+
+
+def gerar_tabela(caminho_db, linhas, semente=42):
+    if os.path.exists(caminho_db):
+        os.remove(caminho_db)
+    conn = sqlite3.connect(caminho_db, isolation_level=None)
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode = OFF")
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("BEGIN")
+    criarTabelaShopping(cursor)
+    # O índice único da ingestão só deixaria a carga mais lenta: as linhas
+    # sintéticas não se repetem
+    cursor.execute("DROP INDEX ux_shopping_linha")
+
+    # Linhas do gerador sintético, com as colunas derivadas da ingestão
+    inserirBlocos(cursor, (derivarColunas(bloco) for bloco in gerarBlocos(linhas, semente)))
+    cursor.execute("COMMIT")
+    return conn
+
+
+def preparar_banco(caminho_db, linhas, agregados=True):
+    # Devolve a conexão aberta (autocommit), para o benchmark continuar dela
+    conn = gerar_tabela(caminho_db, linhas)
+    cursor = conn.cursor()
+    criarIndices(cursor)
+    if agregados:
+        atualizarAgregados(cursor)
+    cursor.execute("ANALYZE")
+    return conn
+
+
+def rss_maximo_mb():
+    # VmHWM é zerado no exec; ru_maxrss herda o pico do processo pai no Linux
+    try:
+        with open('/proc/self/status') as status:
+            for linha in status:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _executar(fila, funcao, args):
+    fila.put(funcao(*args))
+
+
+def medir_em_processo(funcao, *args):
+    # A função precisa ser do nível do módulo (spawn). O processo herda as
+    # variáveis de ambiente (SHOPPING_DB etc.) definidas antes da chamada
+    contexto = multiprocessing.get_context('spawn')
+    fila = contexto.Queue()
+    processo = contexto.Process(target=_executar, args=(fila, funcao, args))
+    processo.start()
+    resultado = fila.get()
+    processo.join()
+    return resultado
+
+
+def rastrear_consultas():
+    # Lista que recebe o SQL de cada comando executado pelo pool. O pool é LIFO:
+    # numa única thread, as consultas seguintes reutilizam esta conexão
+    from data.Conexao import conexao
+
+    sqls = []
+    with conexao() as conn:
+        conn.set_trace_callback(sqls.append)
+    return sqls
+
+
+def tabelas_lidas(caminho_db, sqls):
+    # Uma entrada por tabela lida nos planos das consultas; um SEARCH por índice
+    # também conta, porque o intervalo pode cobrir quase a tabela inteira
+    conn = sqlite3.connect(f"file:{caminho_db}?mode=ro", uri=True)
+    tabelas = []
+    try:
+        for sql in sqls:
+            for _, _, _, detalhe in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+                encontrado = _LEITURA.match(detalhe)
+                if encontrado is not None:
+                    tabelas.append(encontrado.group(1))
+    finally:
+        conn.close()
+    return tabelas
+
+
+def passos_vm(caminho_db, sqls):
+    # Executa cada consulta até o fim numa conexão nova (sem o page cache do pool)
+    # e conta as instruções da VM com o progress handler chamado a cada passo.
+    # Ao contrário do plano, não depende de estimar quantas linhas um SCAN ou um
+    # SEARCH toca: conta o que a execução fez
+    conn = sqlite3.connect(f"file:{caminho_db}?mode=ro", uri=True)
+    passos = 0
+
+    def contar():
+        nonlocal passos
+        passos += 1
+        return 0
+
+    conn.set_progress_handler(contar, 1)
+    try:
+        for sql in sqls:
+            for _ in conn.execute(sql):
+                pass
+    finally:
+        conn.close()
+    return passos
@@ -0,0 +1,419 @@
+# Agregados materializados durante a ingestão: o cubo por localização, o
+# resumo geral do dashboard, os momentos das colunas numéricas (correlação) e
+# as células da comparação de segmentos (data/Segmentos.py).
+# As páginas só fazem SELECT neles; nada de DDL nem varredura de shopping no
+# caminho de renderização.
+#
+# Cada tabela é declarada uma vez (TABELAS): a chave, os grupos que a preenchem
+# e as medidas aditivas. Da mesma declaração saem dois caminhos:
+#   AcumuladorAgregados - soma os blocos enquanto a ingestão os insere (pandas),
+#                         sem nenhuma varredura extra de shopping
+#   atualizarAgregados  - recalcula a partir de shopping (SQL), inteiro ou só
+#                         as linhas depois de um rowid; é a referência dos benchmarks
+from dataclasses import dataclass
+from itertools import combinations_with_replacement
+
+import numpy as np
+import pandas as pd
+
+from data.Esquema import ESTADOS
+
+# Dimensões do cubo (além da linha 'total' de cada localização)
+DIMENSOES = [
+    'category',
+    'payment_method',
+    'gender',
+    'discount_applied',
+    'season',
+    'size',
+    'color',
+]
+
+# Colunas calculadas só para os agregados: nome -> (expressão SQL, cálculo no
+# bloco do pandas). Podem abrir um grupo como uma coluna de shopping
+EXPRESSOES = {
+    'age_decade': ('(age / 10) * 10', lambda bloco: bloco['age'] // 10 * 10),
+}
+
+# Dimensões do resumo geral: nome -> (coluna do valor, coluna do subvalor)
+DIMENSOES_RESUMO = {
+    'total': (None, None),
+    'item_purchased': ('item_purchased', None),
+    'season': ('season', None),
+    'category_gender': ('category', 'gender'),
+    'age_decade': ('age_decade', None),
+}
+
+# Divisões da comparação de segmentos: nome -> indicador 0/1 derivado na
+# ingestão (data/Esquema.py)
+DIVISOES_SEGMENTOS = {
+    'desconto': 'has_discount',
+    'cupom': 'has_promo_code',
+    'assinatura': 'is_subscriber',
+}
+
+# Dimensões que podem abrir a comparação (além da linha 'total' de cada segmento)
+DIMENSOES_SEGMENTOS = [
+    'season',
+    'category',
+    'preferred_payment_method',
+    'frequency_of_purchases',
+    'payment_method',
+    'shipping_type',
+]
+
+# Medidas aditivas: (nome, tipo, agregação, expressão). A expressão é uma coluna
+# de shopping, um par de colunas (produto) ou None (COUNT(*)). A agregação diz
+# também como juntar o valor guardado com o de um lote novo (COMBINACOES), então
+# os agregados podem ser atualizados só com as linhas acrescentadas
+MEDIDAS = [
+    ('n', 'INTEGER', 'COUNT', None),
+    ('soma_valor', 'REAL', 'SUM', 'purchase_amount_usd'),
+    ('soma_quad_valor', 'REAL', 'SUM', ('purchase_amount_usd', 'purchase_amount_usd')),
+    ('min_valor', 'REAL', 'MIN', 'purchase_amount_usd'),
+    ('max_valor', 'REAL', 'MAX', 'purchase_amount_usd'),
+    ('soma_idade', 'INTEGER', 'SUM', 'age'),
+    ('soma_avaliacao', 'REAL', 'SUM', 'review_rating'),
+    ('assinantes', 'INTEGER', 'SUM', 'is_subscriber'),
+    ('soma_freq_anual', 'INTEGER', 'SUM', 'annual_frequency'),
+    ('n_freq', 'INTEGER', 'COUNT', 'annual_frequency'),
+]
+
+# Medidas por célula da comparação de segmentos; as médias são razões delas
+MEDIDAS_SEGMENTOS = [
+    ('n', 'INTEGER', 'COUNT', None),
+    ('soma_valor', 'REAL', 'SUM', 'purchase_amount_usd'),
+    ('soma_avaliacao', 'REAL', 'SUM', 'review_rating'),
+    ('soma_compras_anteriores', 'INTEGER', 'SUM', 'previous_purchases'),
+]
+
+# Colunas numéricas com momentos materializados (data/Correlacao.py)
+COLUNAS_MOMENTOS = ['age', 'purchase_amount_usd', 'review_rating', 'previous_purchases']
+
+
+def nomeMomento(a, b=None):
+    # Σa ou, com b, Σa·b; o par é nomeado na ordem em que as colunas foram pedidas
+    return f"soma_{a}" if b is None else f"soma_{a}_x_{b}"
+
+
+def medidasMomentos(colunas):
+    # Estatísticas suficientes de covariância no formato de MEDIDAS: n, Σx de cada
+    # coluna e Σxy de cada par (com a diagonal Σx²). Todas aditivas entre lotes
+    return (
+        [('n', 'INTEGER', 'COUNT', None)]
+        + [(nomeMomento(coluna), 'REAL', 'SUM', coluna) for coluna in colunas]
+        + [(nomeMomento(a, b), 'REAL', 'SUM', (a, b)) for a, b in combinations_with_replacement(colunas, 2)]
+    )
+
+
+MOMENTOS = medidasMomentos(COLUNAS_MOMENTOS)
+
+# Como cada agregação junta o valor guardado ({t}.{m}) com o do lote (excluded.{m});
+# os COALESCE preservam o NULL de SUM/MIN/MAX sobre nenhum valor
+COMBINACOES = {
+    'COUNT': 'COALESCE({t}.{m} + excluded.{m}, {t}.{m}, excluded.{m})',
+    'SUM': 'COALESCE({t}.{m} + excluded.{m}, {t}.{m}, excluded.{m})',
+    'MIN': 'COALESCE(MIN({t}.{m}, excluded.{m}), {t}.{m}, excluded.{m})',
+    'MAX': 'COALESCE(MAX({t}.{m}, excluded.{m}), {t}.{m}, excluded.{m})',
+}
+
+# A mesma combinação entre blocos, no pandas
+_COMBINACOES_PANDAS = {'COUNT': 'sum', 'SUM': 'sum', 'MIN': 'min', 'MAX': 'max'}
+_AGREGACOES_PANDAS = {'COUNT': 'count', 'SUM': 'sum', 'MIN': 'min', 'MAX': 'max'}
+
+
+@dataclass(frozen=True)
+class Agregado:
+    # Uma tabela de agregados: cada grupo é (valores fixos, colunas agrupadas),
+    # dois dicionários coluna da chave -> valor/coluna de shopping; as colunas da
+    # chave fora dos dois ficam com ''
+    nome: str
+    chave: tuple
+    grupos: tuple
+    medidas: tuple
+
+    @property
+    def colunas(self):
+        return list(self.chave) + [medida for medida, _, _, _ in self.medidas]
+
+
+TABELAS = [
+    Agregado(
+        'cubo',
+        ('location', 'dimensao', 'valor'),
+        tuple(
+            [({'dimensao': 'total'}, {'location': 'location'})]
+            + [({'dimensao': dimensao}, {'location': 'location', 'valor': dimensao}) for dimensao in DIMENSOES]
+        ),
+        tuple(MEDIDAS),
+    ),
+    Agregado(
+        'resumo',
+        ('dimensao', 'valor', 'subvalor'),
+        tuple(
+            (
+                {'dimensao': dimensao},
+                {chave: coluna for chave, coluna in (('valor', valor), ('subvalor', subvalor)) if coluna},
+            )
+            for dimensao, (valor, subvalor) in DIMENSOES_RESUMO.items()
+        ),
+        tuple(MEDIDAS),
+    ),
+    # Uma linha só ('total'): a matriz de correlação sai dela sem ler shopping
+    Agregado('momentos', ('conjunto',), (({'conjunto': 'total'}, {}),), tuple(MOMENTOS)),
+    # Cada divisão: o segmento (valor do indicador, '0'/'1') na linha 'total' e
+    # por valor de cada dimensão, uma de cada vez
+    Agregado(
+        'segmentos',
+        ('divisao', 'segmento', 'dimensao', 'valor'),
+        tuple(
+            grupo
+            for divisao, indicador in DIVISOES_SEGMENTOS.items()
+            for grupo in (
+                [({'divisao': divisao, 'dimensao': 'total'}, {'segmento': indicador})]
+                + [
+                    ({'divisao': divisao, 'dimensao': dimensao}, {'segmento': indicador, 'valor': dimensao})
+                    for dimensao in DIMENSOES_SEGMENTOS
+                ]
+            )
+        ),
+        tuple(MEDIDAS_SEGMENTOS),
+    ),
+]
+
+COLUNAS_CUBO, COLUNAS_RESUMO, COLUNAS_MOMENTOS_TABELA, COLUNAS_SEGMENTOS = (tabela.colunas for tabela in TABELAS)
+COLUNAS_RECEITA_ESTADO = ['state_code', 'total_revenue']
+
+# Objetos criados pelas versões anteriores da ingestão e da página de localização
+OBSOLETOS = [
+    ('VIEW', 'maps'),
+    ('VIEW', 'payments'),
+    ('VIEW', 'genders'),
+    ('TABLE', 'agg_location_category'),
+    ('TABLE', 'agg_location_payment'),
+    ('TABLE', 'agg_location_gender'),
+]
+
+
+def expressaoMedida(agregacao, expressao):
+    # SQL de uma medida sobre shopping
+    if expressao is None:
+        return 'COUNT(*)'
+    if isinstance(expressao, tuple):
+        expressao = ' * '.join(expressao)
+    return f'{agregacao}({expressao})'
+
+
+def _literal(valor):
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+def _colunas(cursor, tabela):
+    return [row[1] for row in cursor.execute(f"PRAGMA table_info({tabela})")]
+
+
+def _grupos_presentes(cursor, tabela):
+    # Com dados, cada grupo declarado deixa ao menos uma linha: um banco gravado
+    # antes de um grupo novo (uma dimensão a mais) não tem os valores fixos dele
+    fixas = list(tabela.grupos[0][0])
+    declarados = {tuple(fixos[coluna] for coluna in fixas) for fixos, _ in tabela.grupos}
+    presentes = set(cursor.execute(f"SELECT DISTINCT {', '.join(fixas)} FROM {tabela.nome}"))
+    return not presentes or presentes == declarados
+
+
+def agregadosExistem(cursor):
+    return (
+        all(_colunas(cursor, tabela.nome) == tabela.colunas for tabela in TABELAS)
+        and _colunas(cursor, 'receita_estado') == COLUNAS_RECEITA_ESTADO
+        and all(_grupos_presentes(cursor, tabela) for tabela in TABELAS)
+    )
+
+
+def _sql(origem):
+    # Coluna de shopping ou expressão de EXPRESSOES, no SELECT e no GROUP BY
+    return EXPRESSOES[origem][0] if origem in EXPRESSOES else origem
+
+
+def _serie(bloco, origem):
+    # O mesmo no bloco do pandas
+    return EXPRESSOES[origem][1](bloco) if origem in EXPRESSOES else bloco[origem]
+
+
+def _criar_tabela(cursor, tabela):
+    definicao_medidas = ',\n            '.join(f"{medida} {tipo}" for medida, tipo, _, _ in tabela.medidas)
+    definicao_chave = ',\n            '.join(f"{coluna} TEXT" for coluna in tabela.chave)
+    cursor.execute(f"DROP TABLE IF EXISTS {tabela.nome}")
+    cursor.execute(f'''
+        CREATE TABLE {tabela.nome} (
+            {definicao_chave},
+            {definicao_medidas},
+            PRIMARY KEY ({', '.join(tabela.chave)})
+        ) WITHOUT ROWID
+    ''')
+
+
+def _conflito(tabela):
+    # Upsert: a linha nova soma (ou MIN/MAX) com a guardada pela chave
+    atribuicoes = ',\n            '.join(
+        f"{medida} = {COMBINACOES[agregacao].format(t=tabela.nome, m=medida)}"
+        for medida, _, agregacao, _ in tabela.medidas
+    )
+    return f'''
+        ON CONFLICT ({', '.join(tabela.chave)}) DO UPDATE SET
+            {atribuicoes}
+        '''
+
+
+def _inserir(cursor, tabela, grupo, desde):
+    # Sem desde: carga inicial de shopping inteira. Com desde: só as linhas com
+    # rowid maior, somadas às que já existem pela chave (upsert)
+    fixos, agrupadas = grupo
+    selecao = ', '.join(
+        _literal(fixos[coluna]) if coluna in fixos
+        else _sql(agrupadas[coluna]) if coluna in agrupadas
+        else "''"
+        for coluna in tabela.chave
+    )
+    expressoes = ', '.join(expressaoMedida(agregacao, expressao) for _, _, agregacao, expressao in tabela.medidas)
+    # Sem colunas agrupadas, o agregado é uma linha só; o HAVING a descarta num lote vazio
+    agrupamento = f"GROUP BY {', '.join(map(_sql, agrupadas.values()))}" if agrupadas else "HAVING COUNT(*) > 0"
+    # No lote, NOT INDEXED força a busca pela faixa de rowid; senão o planejador
+    # prefere varrer um índice de cobertura inteiro por causa do GROUP BY
+    origem = 'shopping' if desde is None else 'shopping NOT INDEXED'
+    sql = f'''
+        INSERT INTO {tabela.nome}
+        SELECT {selecao}, {expressoes}
+        FROM {origem}
+        WHERE rowid > ?
+        {agrupamento}
+    '''
+    if desde is not None:
+        sql += _conflito(tabela)
+    cursor.execute(sql, (desde or 0,))
+
+
+def _recriar(cursor):
+    for tipo, nome in OBSOLETOS:
+        cursor.execute(f"DROP {tipo} IF EXISTS {nome}")
+    for tabela in TABELAS:
+        _criar_tabela(cursor, tabela)
+
+
+def atualizarAgregados(cursor, desde=None):
+    # Recalcula os agregados a partir de shopping, um GROUP BY por grupo; deve rodar
+    # dentro da transação da ingestão. desde=None recalcula tudo; desde=<rowid>
+    # aplica só as linhas acrescentadas depois dele
+    if desde is None:
+        _recriar(cursor)
+    for tabela in TABELAS:
+        for grupo in tabela.grupos:
+            _inserir(cursor, tabela, grupo, desde)
+    _atualizar_receita_estado(cursor)
+
+
+class AcumuladorAgregados:
+    # Soma os agregados bloco a bloco, com os blocos que a ingestão insere em
+    # shopping: cada bloco passa por um groupby por grupo, e o acumulado de cada
+    # tabela (do tamanho da tabela, não de shopping) é combinado a cada bloco
+
+    def __init__(self):
+        self._acumulados = {tabela.nome: None for tabela in TABELAS}
+
+    def somar(self, bloco):
+        if not len(bloco):
+            return
+        bloco = bloco.reset_index(drop=True)
+        for tabela in TABELAS:
+            entradas, reducoes = self._entradas(bloco, tabela)
+            parciais = [self._agrupar(bloco, entradas, reducoes, tabela, grupo) for grupo in tabela.grupos]
+            atual = self._acumulados[tabela.nome]
+            if atual is not None:
+                parciais.insert(0, atual)
+            self._acumulados[tabela.nome] = self._combinar(pd.concat(parciais, ignore_index=True), tabela)
+
+    @staticmethod
+    def _entradas(bloco, tabela):
+        # As expressões das medidas, calculadas uma vez por bloco para todos os
+        # grupos, e as medidas de cada redução do pandas (COUNT(*) soma uns)
+        entradas = {}
+        reducoes = {}
+        for medida, _, agregacao, expressao in tabela.medidas:
+            if expressao is None:
+                entradas[medida] = np.ones(len(bloco), dtype='int64')
+                reducao = 'sum'
+            elif isinstance(expressao, tuple):
+                a, b = expressao
+                entradas[medida] = bloco[a].to_numpy('float64') * bloco[b].to_numpy('float64')
+                reducao = _AGREGACOES_PANDAS[agregacao]
+            else:
+                entradas[medida] = bloco[expressao]
+                reducao = _AGREGACOES_PANDAS[agregacao]
+            reducoes.setdefault(reducao, []).append(medida)
+        return pd.DataFrame(entradas), reducoes
+
+    @staticmethod
+    def _agrupar(bloco, entradas, reducoes, tabela, grupo):
+        # Um groupby por grupo e uma redução por tipo (sum, count, min, max): o
+        # agg nomeado custa mais que a própria agregação de um bloco
+        fixos, agrupadas = grupo
+        chaves = [_serie(bloco, origem).rename(f'_chave_{coluna}') for coluna, origem in agrupadas.items()]
+        agrupado = entradas.groupby(chaves or np.zeros(len(entradas), dtype='int8'), sort=False, observed=True)
+        resultado = pd.concat(
+            [getattr(agrupado[medidas], reducao)() for reducao, medidas in reducoes.items()], axis=1
+        ).reset_index(drop=not chaves)
+
+        for coluna in tabela.chave:
+            if coluna in fixos:
+                resultado[coluna] = fixos[coluna]
+            elif coluna in agrupadas:
+                resultado[coluna] = resultado[f'_chave_{coluna}'].astype(str)
+            else:
+                resultado[coluna] = ''
+        return resultado[tabela.colunas]
+
+    @staticmethod
+    def _combinar(quadro, tabela):
+        return quadro.groupby(list(tabela.chave), sort=False).agg(
+            {medida: _COMBINACOES_PANDAS[agregacao] for medida, _, agregacao, _ in tabela.medidas}
+        ).reset_index()
+
+    def gravar(self, cursor, completo):
+        # completo: recria as tabelas com o acumulado; senão, soma o acumulado às
+        # linhas existentes (upsert). Roda na transação da ingestão
+        if completo:
+            _recriar(cursor)
+        for tabela in TABELAS:
+            acumulado = self._acumulados[tabela.nome]
+            if acumulado is None:
+                continue
+            sql = (
+                f"INSERT INTO {tabela.nome} ({', '.join(tabela.colunas)}) "
+                f"VALUES ({', '.join('?' * len(tabela.colunas))})"
+            )
+            if not completo:
+                sql += _conflito(tabela)
+            cursor.executemany(sql, zip(*(acumulado[coluna].tolist() for coluna in tabela.colunas)))
+        _atualizar_receita_estado(cursor)
+
+
+def _atualizar_receita_estado(cursor):
+    # Série do mapa (uma linha por estado), lida das linhas 'total' do cubo
+    cursor.execute("DROP TABLE IF EXISTS estados")
+    cursor.execute("CREATE TABLE estados (location TEXT PRIMARY KEY, state_code TEXT NOT NULL) WITHOUT ROWID")
+    cursor.executemany("INSERT INTO estados VALUES (?, ?)", ESTADOS.items())
+
+    cursor.execute("DROP TABLE IF EXISTS receita_estado")
+    cursor.execute('''
+        CREATE TABLE receita_estado (
+            state_code TEXT PRIMARY KEY,
+            total_revenue REAL
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        INSERT INTO receita_estado
+        SELECT estados.state_code, SUM(cubo.soma_valor)
+        FROM cubo
+        JOIN estados USING (location)
+        WHERE cubo.dimensao = 'total'
+        GROUP BY estados.state_code
+    ''')
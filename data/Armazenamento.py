@@ -0,0 +1,85 @@
+# Leitura linha a linha de shopping, de SQLite ou de um dataset Parquet, para os
+# benchmarks (benchmarks/bench_*.py) e análises avulsas. Nenhuma página lê por
+# aqui: elas leem os agregados da ingestão, sempre no SQLite publicado. Quem lê
+# pede só as colunas que usa (projeção) e passa os filtros no formato do pyarrow,
+# [(coluna, operador, valor), ...], que os dois backends aplicam na origem
+# (predicate pushdown). O dataset Parquet não é gravado pela ingestão: é
+# exportado sob demanda com data.CriacaoDB.escreverParquet.
+#
+# O quadro fica no cache de resultados, por versão dos dados.
+import os
+
+import pandas as pd
+
+from data.Cache import cache
+from data.Conexao import consultar, versaoDados
+from data.CriacaoDB import PARQUET_PATH
+
+_OPERADORES_SQL = {
+    '=': '=', '==': '=', '!=': '!=',
+    '<': '<', '<=': '<=', '>': '>', '>=': '>=',
+    'in': 'IN', 'not in': 'NOT IN',
+}
+
+
+def _carregar_sqlite(colunas, filtros):
+    clausulas, params = [], []
+    for coluna, operador, valor in filtros:
+        if operador in ('in', 'not in'):
+            valores = list(valor)
+            if not valores:
+                clausulas.append("1 = 0" if operador == 'in' else "1 = 1")
+                continue
+            clausulas.append(f"{coluna} {_OPERADORES_SQL[operador]} ({', '.join('?' * len(valores))})")
+            params.extend(valores)
+        else:
+            clausulas.append(f"{coluna} {_OPERADORES_SQL[operador]} ?")
+            params.append(valor)
+
+    projecao = ', '.join(colunas) if colunas else '*'
+    where = f" WHERE {' AND '.join(clausulas)}" if clausulas else ''
+    # Sem memorizar aqui: o quadro fica no cache de carregar
+    return consultar(f"SELECT {projecao} FROM shopping{where}", tuple(params), memorizar=False)
+
+
+def _carregar_parquet(colunas, filtros):
+    # Filtros sobre a coluna de partição descartam diretórios inteiros;
+    # os demais usam as estatísticas dos row groups
+    df = pd.read_parquet(PARQUET_PATH, columns=colunas, filters=filtros or None)
+    if colunas:
+        df = df[colunas]
+    return df
+
+
+def _versao_parquet(backend):
+    # escreverParquet troca o dataset por rename: a identidade do diretório
+    # distingue um dataset exportado de novo dentro da mesma versão do banco
+    if backend != 'parquet':
+        return None
+    try:
+        status = os.stat(PARQUET_PATH)
+    except FileNotFoundError:
+        return None
+    return status.st_ino, status.st_mtime_ns
+
+
+def _carregar(colunas, filtros, backend):
+    if backend == 'parquet':
+        return _carregar_parquet(colunas, filtros)
+    return _carregar_sqlite(colunas, filtros)
+
+
+def carregar(colunas=None, filtros=(), backend='sqlite'):
+    # backend: 'sqlite' (o banco publicado) ou 'parquet' (o dataset em PARQUET_PATH)
+    if backend not in ('sqlite', 'parquet'):
+        raise ValueError(f"Backend desconhecido: {backend}")
+    colunas = list(colunas) if colunas else None
+    filtros = [
+        (coluna, operador, tuple(valor) if isinstance(valor, (list, tuple, set)) else valor)
+        for coluna, operador, valor in filtros
+    ]
+    chave = (
+        'carregar', backend, tuple(colunas or ()), tuple(filtros),
+        versaoDados(), _versao_parquet(backend),
+    )
+    return cache.obter(chave, lambda: _carregar(colunas, filtros, backend))
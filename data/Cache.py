@@ -0,0 +1,87 @@
+# Cache de resultados compartilhado por todas as sessões do processo.
+# As chaves incluem a versão dos dados (PRAGMA user_version, incrementado pela
+# ingestão), então um resultado nunca sobrevive a uma carga nova. Os valores
+# saem por LRU quando a soma dos tamanhos passa do orçamento de memória.
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+ORCAMENTO_MB = int(os.environ.get("SHOPPING_CACHE_MB", "512"))
+
+
+def _tamanho(valor):
+    # Aproximação do espaço ocupado; basta para o orçamento do LRU
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(_tamanho(item) for item in valor)
+    return sys.getsizeof(valor)
+
+
+def _copia(valor):
+    # Quadros voltam como cópia: as páginas acrescentam colunas e reordenam à vontade
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return valor.copy()
+    if isinstance(valor, list):
+        return list(valor)
+    return valor
+
+
+class _Cache:
+
+    def __init__(self, orcamento):
+        self.orcamento = orcamento
+        self._entradas = OrderedDict()
+        self._ocupado = 0
+        self._calculando = {}
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, chave, calcular, medir=_tamanho):
+        # Uma única thread calcula cada chave; as demais esperam pelo mesmo resultado
+        while True:
+            with self._lock:
+                if chave in self._entradas:
+                    self._entradas.move_to_end(chave)
+                    self.acertos += 1
+                    return _copia(self._entradas[chave][0])
+                evento = self._calculando.get(chave)
+                if evento is None:
+                    evento = self._calculando[chave] = threading.Event()
+                    self.faltas += 1
+                    break
+            evento.wait()
+            # Se quem calculava falhou, a próxima volta tenta de novo
+
+        try:
+            valor = calcular()
+            self._guardar(chave, valor, medir(valor))
+            return _copia(valor)
+        finally:
+            with self._lock:
+                del self._calculando[chave]
+            evento.set()
+
+    def _guardar(self, chave, valor, tamanho):
+        with self._lock:
+            if tamanho > self.orcamento:
+                return
+            self._entradas[chave] = (valor, tamanho)
+            self._ocupado += tamanho
+            while self._ocupado > self.orcamento:
+                _, (_, liberado) = self._entradas.popitem(last=False)
+                self._ocupado -= liberado
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._ocupado = 0
+
+
+cache = _Cache(ORCAMENTO_MB * 2**20)
@@ -0,0 +1,173 @@
+import os
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from data.Cache import cache
+from data.CriacaoDB import DB_PATH
+from data.Instrumentacao import instrumentarConsulta
+
+# Ajustes das conexões de leitura
+TAMANHO_POOL = 8
+CACHE_SIZE_KB = 64 * 1024
+MMAP_SIZE = 256 * 1024 * 1024
+CACHED_STATEMENTS = 256
+
+
+class _Pool:
+    # Pool de conexões somente leitura, compartilhado por todas as sessões do processo.
+    # Cada conexão é usada por uma thread de cada vez; o semáforo limita quantas existem.
+
+    def __init__(self, caminho, tamanho):
+        self.caminho = caminho
+        self._livres = queue.LifoQueue()
+        self._vagas = threading.BoundedSemaphore(tamanho)
+
+    def _inode(self):
+        return os.stat(self.caminho).st_ino
+
+    def _abrir(self):
+        conn = sqlite3.connect(
+            f"file:{os.path.abspath(self.caminho)}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS,
+        )
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        return conn
+
+    @contextmanager
+    def conexao(self):
+        # Cada conexão guarda o inode do arquivo em que foi aberta. Quando a ingestão
+        # publica uma versão nova (data/Ingestao.py troca o arquivo), as conexões
+        # da versão antiga são fechadas na próxima retirada do pool
+        self._vagas.acquire()
+        try:
+            inode = self._inode()
+            try:
+                conn, inode_conn = self._livres.get_nowait()
+                if inode_conn != inode:
+                    conn.close()
+                    conn = None
+            except queue.Empty:
+                conn = None
+            if conn is None:
+                inode_conn = self._inode()
+                conn = self._abrir()
+            try:
+                yield conn
+            finally:
+                self._livres.put((conn, inode_conn))
+        finally:
+            self._vagas.release()
+
+
+def _aquecer(caminho):
+    # Lê o arquivo do banco uma vez para trazê-lo ao cache de páginas do SO;
+    # com mmap, as consultas seguintes leem direto desse cache
+    with open(caminho, "rb") as arquivo:
+        while arquivo.read(1 << 20):
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _obter_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _Pool(DB_PATH, TAMANHO_POOL)
+                threading.Thread(target=_aquecer, args=(DB_PATH,), daemon=True).start()
+    return _pool
+
+
+def conexao():
+    return _obter_pool().conexao()
+
+
+_versao = None
+_versao_lock = threading.Lock()
+
+
+def _assinatura():
+    # Identidade e mtime do banco e do WAL: um COMMIT sempre altera um dos dois
+    partes = []
+    for caminho in (DB_PATH, f"{DB_PATH}-wal"):
+        try:
+            status = os.stat(caminho)
+            partes.append((status.st_ino, status.st_mtime_ns, status.st_size))
+        except FileNotFoundError:
+            partes.append(None)
+    return tuple(partes)
+
+
+def versaoDados():
+    # PRAGMA user_version, incrementado a cada ingestão; só é relido quando os
+    # arquivos do banco mudam, então o caminho comum não toca o SQLite
+    global _versao
+    assinatura = _assinatura()
+    atual = _versao
+    if atual is None or atual[0] != assinatura:
+        with _versao_lock:
+            with conexao() as conn:
+                numero = conn.execute("PRAGMA user_version").fetchone()[0]
+            if _versao is not None and _versao[1] != numero:
+                cache.limpar()
+            _versao = atual = (assinatura, numero)
+    return atual[1]
+
+
+def _normalizar(sql):
+    # Espaços fora dos literais não mudam a consulta; não devem mudar a chave do cache
+    partes = re.split(r"('(?:[^']|'')*')", sql)
+    return ''.join(parte if i % 2 else ' '.join(parte.split()) for i, parte in enumerate(partes))
+
+
+def _memorizado(tipo, sql, params, executar):
+    chave = (tipo, _normalizar(sql), tuple(params), versaoDados())
+    return cache.obter(chave, executar)
+
+
+@instrumentarConsulta
+def _executar(sql, params):
+    with conexao() as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+def consultar(sql, params=(), memorizar=True):
+    if not memorizar:
+        return _executar(sql, params)
+    return _memorizado('quadro', sql, params, lambda: _executar(sql, params))
+
+
+@instrumentarConsulta
+def _linhas(sql, params):
+    with conexao() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def consultarLinhas(sql, params=()):
+    return _memorizado('linhas', sql, params, lambda: _linhas(sql, params))
+
+
+@instrumentarConsulta
+def _linha(sql, params):
+    with conexao() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def consultarLinha(sql, params=()):
+    return _memorizado('linha', sql, params, lambda: _linha(sql, params))
+
+
+def consultarValor(sql, params=()):
+    return consultarLinha(sql, params)[0]
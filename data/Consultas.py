@@ -0,0 +1,58 @@
+# Consultas parametrizadas das páginas: filtros e GROUP BY rodam no SQLite
+# e só voltam quadros pequenos, já agregados.
+from data.Conexao import consultar, consultarLinha, consultarLinhas
+from data.Esquema import CODIGOS_GENERO
+
+
+def _filtro_perfil(idade_min, idade_max, generos):
+    # WHERE do Perfil do Consumidor, sobre o código inteiro do gênero;
+    # sem gêneros selecionados, nenhuma linha passa
+    if not generos:
+        return "1 = 0", ()
+    codigos = [CODIGOS_GENERO[genero] for genero in generos]
+    marcadores = ', '.join('?' * len(codigos))
+    return f"age BETWEEN ? AND ? AND gender_code IN ({marcadores})", (idade_min, idade_max, *codigos)
+
+
+def faixaIdades():
+    # MIN e MAX numa só ida ao banco; como subconsultas separadas, cada uma
+    # é resolvida por uma busca na ponta do índice de age, sem varredura
+    return consultarLinha("SELECT (SELECT MIN(age) FROM shopping), (SELECT MAX(age) FROM shopping)")
+
+
+def generos():
+    return [row[0] for row in consultarLinhas(
+        "SELECT DISTINCT subvalor FROM resumo WHERE dimensao = 'category_gender' ORDER BY subvalor DESC"
+    )]
+
+
+def _contagem(colunas, idade_min, idade_max, generos):
+    where, params = _filtro_perfil(idade_min, idade_max, generos)
+    return consultar(f"""
+        SELECT {colunas}, COUNT(*) AS count
+        FROM shopping
+        WHERE {where}
+        GROUP BY {colunas}
+    """, params)
+
+
+def heatmapDecadaCategoria(idade_min, idade_max, generos):
+    where, params = _filtro_perfil(idade_min, idade_max, generos)
+    return consultar(f"""
+        SELECT (age / 10) * 10 AS age_decade, category, COUNT(*) AS count
+        FROM shopping
+        WHERE {where}
+        GROUP BY age_decade, category
+    """, params)
+
+
+def coresPorGenero(idade_min, idade_max, generos):
+    return _contagem('gender_code, color', idade_min, idade_max, generos)
+
+
+def assinaturaPorGenero(idade_min, idade_max, generos):
+    return _contagem('gender_code, is_subscriber', idade_min, idade_max, generos)
+
+
+def frequenciaPorDesconto(idade_min, idade_max, generos):
+    return _contagem('annual_frequency, frequency_of_purchases, has_discount', idade_min, idade_max, generos)
@@ -0,0 +1,111 @@
+# Covariância e correlação a partir de estatísticas suficientes: n, Σx de cada
+# coluna e Σxy de cada par (a diagonal é Σx²). Para as colunas de
+# COLUNAS_MOMENTOS as somas já estão na tabela momentos, mantida pela ingestão
+# (data/Agregados.py) e somada lote a lote; a matriz sai de uma linha, com
+# memória O(k²) qualquer que seja o tamanho de shopping. Outras colunas
+# numéricas saem de um único SELECT de agregados sobre shopping, sem trazer
+# as linhas para o pandas.
+#
+# As somas são brutas (não centradas), o que as torna aditivas entre lotes.
+# shopping não tem ausentes (a ingestão descarta as linhas incompletas), então
+# o n é o mesmo para todos os pares.
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from data.Agregados import COLUNAS_MOMENTOS, expressaoMedida, medidasMomentos, nomeMomento
+from data.Conexao import consultar
+from data.Esquema import ESQUEMA
+
+# Colunas de shopping aceitas: as de afinidade numérica, inclusive as derivadas
+NUMERICAS = [coluna for coluna, afinidade in ESQUEMA if afinidade in ('INTEGER', 'REAL')]
+
+
+@dataclass(frozen=True)
+class Momentos:
+    colunas: list
+    n: int
+    somas: pd.Series        # Σx por coluna
+    produtos: pd.DataFrame  # Σxy por par, simétrica
+
+    def medias(self):
+        return self.somas / self.n if self.n else self.somas * np.nan
+
+    def covariancia(self, ddof=1):
+        # (Σxy - ΣxΣy/n) / (n - ddof)
+        if self.n <= ddof:
+            return self.produtos * np.nan
+        somas = self.somas.to_numpy()
+        centrados = self.produtos - np.outer(somas, somas) / self.n
+        return centrados / (self.n - ddof)
+
+    def correlacao(self):
+        # Pearson; coluna constante dá NaN na sua linha e coluna, como no pandas
+        cov = self.covariancia(ddof=0)
+        variancias = np.diag(cov.to_numpy())
+        with np.errstate(invalid='ignore', divide='ignore'):
+            desvios = np.sqrt(np.where(variancias > 0, variancias, np.nan))
+            corr = cov / np.outer(desvios, desvios)
+        corr = corr.clip(-1.0, 1.0)
+        # A diagonal é 1 por definição, sem o arredondamento da divisão
+        for coluna, desvio in zip(self.colunas, desvios):
+            if not np.isnan(desvio):
+                corr.loc[coluna, coluna] = 1.0
+        return corr
+
+
+def _linha_materializada():
+    linha = consultar("SELECT * FROM momentos WHERE conjunto = 'total'")
+    return linha.iloc[0] if len(linha) else None
+
+
+def _linha_agregada(colunas):
+    expressoes = ', '.join(
+        f'{expressaoMedida(agregacao, expressao)} AS {medida}'
+        for medida, _, agregacao, expressao in medidasMomentos(colunas)
+    )
+    return consultar(f"SELECT {expressoes} FROM shopping").iloc[0]
+
+
+def _soma(linha, a, b=None):
+    nome = nomeMomento(a, b)
+    if b is not None and nome not in linha.index:
+        nome = nomeMomento(b, a)
+    valor = linha[nome]
+    return 0.0 if pd.isna(valor) else float(valor)
+
+
+def momentos(colunas=COLUNAS_MOMENTOS):
+    colunas = list(colunas)
+    desconhecidas = set(colunas) - set(NUMERICAS)
+    if desconhecidas:
+        raise ValueError(f"Colunas não numéricas: {sorted(desconhecidas)}")
+
+    if set(colunas) <= set(COLUNAS_MOMENTOS):
+        linha = _linha_materializada()
+    else:
+        linha = _linha_agregada(colunas)
+
+    if linha is None or not linha['n']:
+        vazio = pd.DataFrame(0.0, index=colunas, columns=colunas)
+        return Momentos(colunas, 0, pd.Series(0.0, index=colunas), vazio)
+
+    return Momentos(
+        colunas=colunas,
+        n=int(linha['n']),
+        somas=pd.Series([_soma(linha, coluna) for coluna in colunas], index=colunas),
+        produtos=pd.DataFrame(
+            [[_soma(linha, a, b) for b in colunas] for a in colunas],
+            index=colunas,
+            columns=colunas,
+        ),
+    )
+
+
+def correlacao(colunas=COLUNAS_MOMENTOS):
+    return momentos(colunas).correlacao()
+
+
+def covariancia(colunas=COLUNAS_MOMENTOS, ddof=1):
+    return momentos(colunas).covariancia(ddof)
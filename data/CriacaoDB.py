@@ -1,56 +1,536 @@
+import hashlib
+import importlib.util
+import itertools
+import logging
+import multiprocessing
+import os
+import shutil
 import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 
-def criarTable():
-    # 1. Lê o CSV
-    df = pd.read_csv("data/shopping_trends.csv", sep=',', encoding='utf-8')
+from data.Agregados import AcumuladorAgregados, agregadosExistem
+from data.Esquema import (
+    COLUNAS,
+    COLUNAS_TABELA,
+    DTYPES,
+    ESQUEMA,
+    TIPOS_LEITURA,
+    dentroDosDominios,
+    derivarColunas,
+)
 
-    # 2. Remove valores nulos e duplicatas
-    df.dropna(inplace=True)
-    df.drop_duplicates(inplace=True)
+# Caminhos podem ser trocados por variáveis de ambiente (benchmarks, ambientes de teste)
+CSV_PATH = os.environ.get("SHOPPING_CSV", "data/shopping_trends.csv")
+DB_PATH = os.environ.get("SHOPPING_DB", "data/shopping.db")
+# Diretório de entrada com um CSV por loja/dia (alternativa ao CSV único)
+ENTRADA_PATH = os.environ.get("SHOPPING_ENTRADA", "data/entrada")
 
-    # 3. Renomeia colunas para formato compatível com SQL (snake_case e sem caracteres especiais)
-    df.rename(columns=lambda x: x.strip().lower().replace(' ', '_').replace('(', '').replace(')', ''), inplace=True)
+# Dataset Parquet particionado, exportado sob demanda por escreverParquet; só os
+# benchmarks o leem (data.Armazenamento.carregar(backend='parquet')), o app não
+PARQUET_PATH = os.environ.get("SHOPPING_PARQUET", "data/shopping_parquet")
+PARTICAO_PARQUET = os.environ.get("SHOPPING_PARTICAO", "location")
 
-    # 4. Converte tipos de dados quando necessário
-    df['age'] = df['age'].astype(int)
-    df['purchase_amount_usd'] = df['purchase_amount_usd'].astype(float)
-    df['review_rating'] = df['review_rating'].astype(float)
-    df['previous_purchases'] = df['previous_purchases'].astype(int)
+# Leitor do CSV: 'c' (pandas) ou 'pyarrow' (pyarrow.csv sobre faixas de bytes de
+# tamanho fixo, mais rápido; é o padrão quando o pyarrow está instalado)
+MOTOR_CSV = os.environ.get(
+    "SHOPPING_MOTOR_CSV", "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+)
 
-    # 5. Cria conexão SQLite
-    conn = sqlite3.connect("data/shopping.db")
-    cursor = conn.cursor()
+_log = logging.getLogger(__name__)
+
+# Índices para os padrões de acesso das páginas; os de location e season
+# cobrem as colunas dos KPIs para que as consultas não toquem a tabela
+INDICES = {
+    'ix_shopping_location': 'location, purchase_amount_usd, age, review_rating, is_subscriber',
+    'ix_shopping_location_category': 'location, category, purchase_amount_usd',
+    'ix_shopping_season': 'season, purchase_amount_usd, review_rating',
+    'ix_shopping_discount_applied': 'discount_applied',
+    'ix_shopping_subscription_status': 'subscription_status',
+    'ix_shopping_age': 'age, gender_code, category',
+}
+
+TAMANHO_BLOCO = 50_000
+# Bytes de CSV por leitura do pyarrow
+TAMANHO_FAIXA = 8 << 20
+
+
+def normalizarColuna(nome):
+    # snake_case e sem caracteres especiais, compatível com SQL
+    return nome.strip().lower().replace(' ', '_').replace('(', '').replace(')', '')
+
+
+def _limpar(df):
+    # Remove linhas fora dos domínios do esquema (data/Esquema.py) e valores nulos
+    # e acrescenta as colunas derivadas; os tipos já vêm da leitura e as duplicatas
+    # são descartadas pelo índice único no SQLite
+    validas, recusadas = dentroDosDominios(df)
+    if recusadas:
+        _log.warning("Linhas ausentes ou fora dos domínios declarados descartadas: %s", recusadas)
+        df = df[validas]
+    return derivarColunas(df.dropna()[COLUNAS])
+
+
+def _ler_blocos_pyarrow(arquivo, nomes, offset):
+    # Uma faixa de TAMANHO_FAIXA bytes por vez, completada até o fim da linha, vira
+    # um read_csv do pyarrow. O leitor em fluxo (open_csv) lê adiante e acumula
+    # buffers: o pico de RSS crescia com o tamanho do arquivo
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    tipos = {
+        'str': pa.string(), 'category': pa.dictionary(pa.int32(), pa.string()),
+        'Int64': pa.int64(), 'float64': pa.float64(),
+    }
+    leitura = pacsv.ReadOptions(column_names=nomes)
+    conversao = pacsv.ConvertOptions(
+        column_types={coluna: tipos[tipo] for coluna, tipo in TIPOS_LEITURA.items()},
+        include_columns=COLUNAS,
+    )
+    if not offset:
+        arquivo.readline()  # cabeçalho
+    while True:
+        faixa = arquivo.read(TAMANHO_FAIXA)
+        if not faixa:
+            return
+        faixa += arquivo.readline()
+        # Aspas em número ímpar: o corte caiu dentro de um campo com quebra de linha
+        while faixa.count(b'"') % 2:
+            linha = arquivo.readline()
+            if not linha:
+                break
+            faixa += linha
+        tabela = pacsv.read_csv(pa.py_buffer(faixa), read_options=leitura, convert_options=conversao)
+        yield _limpar(tabela.to_pandas())
+
+
+def lerBlocos(caminho_csv, offset=0):
+    # Lê o CSV em blocos de tamanho fixo, a partir de `offset` bytes,
+    # para que a memória não cresça com o tamanho do arquivo. Só as colunas do
+    # esquema são lidas, já com os dtypes declarados (sem inferência nem astype)
+    cabecalho = pd.read_csv(caminho_csv, sep=',', encoding='utf-8', nrows=0).columns
+    nomes = [normalizarColuna(nome) for nome in cabecalho]
+
+    with open(caminho_csv, "rb") as arquivo:
+        if offset:
+            arquivo.seek(offset)
+        if MOTOR_CSV == "pyarrow":
+            yield from _ler_blocos_pyarrow(arquivo, nomes, offset)
+            return
+        leitor = pd.read_csv(
+            arquivo,
+            sep=',',
+            encoding='utf-8',
+            header=0 if offset == 0 else None,
+            names=nomes,
+            usecols=COLUNAS,
+            dtype=DTYPES,
+            chunksize=TAMANHO_BLOCO,
+        )
+        for bloco in leitor:
+            yield _limpar(bloco)
+
+
+def _impressao_digital(caminho, prefixo=None):
+    # Calcula o hash do arquivo inteiro e, se pedido, dos primeiros `prefixo` bytes
+    # numa única leitura, para detectar se o CSV apenas cresceu.
+    total = hashlib.sha256()
+    hash_prefixo = None
+    lidos = 0
+    with open(caminho, "rb") as arquivo:
+        while True:
+            bloco = arquivo.read(1 << 20)
+            if not bloco:
+                break
+            if prefixo is not None and hash_prefixo is None and lidos + len(bloco) >= prefixo:
+                corte = prefixo - lidos
+                total.update(bloco[:corte])
+                hash_prefixo = total.hexdigest()
+                total.update(bloco[corte:])
+            else:
+                total.update(bloco)
+            lidos += len(bloco)
+    return total.hexdigest(), hash_prefixo
 
-    # 6. Cria a tabela se não existir
+
+def _criar_metadados(cursor):
     cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ingestao (
+        fonte TEXT PRIMARY KEY,
+        tamanho INTEGER,
+        mtime REAL,
+        hash TEXT
+    )
+    ''')
+
+
+def criarTabelaShopping(cursor):
+    # Tabela rowid comum, com as afinidades declaradas em ESQUEMA
+    definicao = ',\n        '.join(f"{coluna} {tipo}" for coluna, tipo in ESQUEMA)
+    cursor.execute(f'''
     CREATE TABLE IF NOT EXISTS shopping (
-        customer_id TEXT,
-        age INTEGER,
-        gender TEXT,
-        item_purchased TEXT,
-        category TEXT,
-        purchase_amount_usd REAL,
-        location TEXT,
-        size TEXT,
-        color TEXT,
-        season TEXT,
-        review_rating REAL,
-        subscription_status TEXT,
-        payment_method TEXT,
-        shipping_type TEXT,
-        discount_applied TEXT,
-        promo_code_used TEXT,
-        previous_purchases INTEGER,
-        preferred_payment_method TEXT,
-        frequency_of_purchases TEXT
+        {definicao}
     )
     ''')
 
-    # 7. Insere os dados no banco
-    df.to_sql("shopping", conn, if_exists="replace", index=False)
+    # Índice único sobre a linha do CSV (as derivadas dependem só dela):
+    # deduplicação entre blocos sem guardar nada em memória
+    cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_shopping_linha ON shopping ({', '.join(COLUNAS)})")
+
+
+def criarIndices(cursor):
+    for nome, colunas in INDICES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON shopping ({colunas})")
+
+
+def _esquema_valido(cursor):
+    # Bancos gerados por versões antigas (pandas.to_sql) têm tipos inferidos e nenhum índice
+    colunas = [(row[1], row[2]) for row in cursor.execute("PRAGMA table_info(shopping)")]
+    indices = {row[1] for row in cursor.execute("PRAGMA index_list(shopping)")}
+    return colunas == ESQUEMA and {'ux_shopping_linha', *INDICES} <= indices
+
+
+def inserirBlocos(cursor, blocos, acumulador=None):
+    # Com um acumulador (data/Agregados.py), cada bloco inserido é somado aos
+    # agregados enquanto ainda está em memória
+    insert = (
+        f"INSERT OR IGNORE INTO shopping ({', '.join(COLUNAS_TABELA)}) "
+        f"VALUES ({', '.join('?' * len(COLUNAS_TABELA))})"
+    )
+    for bloco in blocos:
+        if acumulador is not None:
+            ultimo = cursor.execute("SELECT COALESCE(MAX(rowid), 0) FROM shopping").fetchone()[0]
+        # tolist() por coluna converte em bloco; itertuples sobre colunas de texto
+        # do pyarrow converte célula a célula e domina o tempo da carga
+        cursor.executemany(insert, zip(*(bloco[coluna].tolist() for coluna in COLUNAS_TABELA)))
+        if acumulador is None:
+            continue
+        if cursor.rowcount != len(bloco):
+            # Linhas repetidas foram ignoradas pelo índice único: soma só as que
+            # entraram, lidas de volta pela faixa de rowid do bloco
+            bloco = pd.read_sql_query(
+                f"SELECT {', '.join(COLUNAS_TABELA)} FROM shopping WHERE rowid > ?",
+                cursor.connection,
+                params=(ultimo,),
+            )
+        acumulador.somar(bloco)
+
+
+def _nova_versao(cursor):
+    # Nova versão dos dados: invalida o cache de resultados (data/Cache.py)
+    versao = cursor.execute("PRAGMA user_version").fetchone()[0]
+    cursor.execute(f"PRAGMA user_version = {versao + 1}")
+
+
+def escreverParquet(conn, destino=PARQUET_PATH, particao=PARTICAO_PARQUET):
+    # Exporta shopping para um dataset Parquet no layout hive (coluna=valor/).
+    # As linhas saem ordenadas pela partição (há índice para location e season),
+    # então cada partição vira um único arquivo e só um bloco fica em memória.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tipos = {'TEXT': pa.string(), 'INTEGER': pa.int64(), 'REAL': pa.float64()}
+    colunas = [coluna for coluna in COLUNAS_TABELA if coluna != particao]
+    schema = pa.schema([(coluna, tipos[tipo]) for coluna, tipo in ESQUEMA if coluna != particao])
+
+    # Escreve num diretório temporário e troca no final: leitores nunca veem um dataset pela metade
+    temporario = f"{destino}.novo"
+    shutil.rmtree(temporario, ignore_errors=True)
+
+    escritor, atual = None, None
+    blocos = pd.read_sql_query(
+        f"SELECT {particao}, {', '.join(colunas)} FROM shopping ORDER BY {particao}",
+        conn,
+        chunksize=TAMANHO_BLOCO,
+    )
+    try:
+        for bloco in blocos:
+            for valor, grupo in bloco.groupby(particao, sort=False):
+                if valor != atual:
+                    if escritor is not None:
+                        escritor.close()
+                    pasta = os.path.join(temporario, f"{particao}={valor}")
+                    os.makedirs(pasta)
+                    escritor = pq.ParquetWriter(os.path.join(pasta, "parte-0.parquet"), schema)
+                    atual = valor
+                escritor.write_table(pa.Table.from_pandas(grupo[colunas], schema=schema, preserve_index=False))
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+    antigo = f"{destino}.antigo"
+    if os.path.isdir(destino):
+        os.rename(destino, antigo)
+    os.rename(temporario, destino)
+    shutil.rmtree(antigo, ignore_errors=True)
+
+
+def _gravar_versao(conn, acao, inserir, registrar):
+    # Sequência comum de criarTable e ingerirDiretorio, numa única transação:
+    # linhas novas (inserir(cursor, acumulador)), índices e estatísticas,
+    # agregados, nova versão e o registro das fontes (registrar). Fecha a conexão no fim
+    cursor = conn.cursor()
+    acumulador = AcumuladorAgregados()
+    cursor.execute("BEGIN")
+    try:
+        if acao == "completo":
+            cursor.execute("DROP TABLE IF EXISTS shopping")
+            criarTabelaShopping(cursor)
+
+        inserir(cursor, acumulador)
+
+        if acao == "completo":
+            # Índices secundários depois da carga em massa, e estatísticas para o planejador
+            criarIndices(cursor)
+            cursor.execute("ANALYZE")
+        elif acao == "incremental":
+            cursor.execute("PRAGMA optimize")
+
+        # Os agregados das páginas acompanham cada nova versão dos dados: foram
+        # somados bloco a bloco na carga, sem varrer shopping de novo; num
+        # acréscimo, o acumulado das linhas novas é somado aos existentes
+        if acao != "inalterado":
+            acumulador.gravar(cursor, completo=acao == "completo")
+            _nova_versao(cursor)
+
+        registrar(cursor)
+        cursor.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def criarTable(caminho_csv=CSV_PATH, caminho_db=DB_PATH):
+    # 1. Impressão digital barata do CSV (tamanho e mtime)
+    status = os.stat(caminho_csv)
+    tamanho, mtime = status.st_size, status.st_mtime
+
+    # 2. Cria conexão SQLite e lê o registro da última ingestão;
+    # as transações são controladas explicitamente (BEGIN/COMMIT)
+    conn = sqlite3.connect(caminho_db, isolation_level=None)
+    cursor = conn.cursor()
+
+    # WAL fica gravado no arquivo: os leitores (data/Conexao.py) não bloqueiam a ingestão
+    cursor.execute("PRAGMA journal_mode = WAL")
+    _criar_metadados(cursor)
+
+    registro = cursor.execute(
+        "SELECT tamanho, mtime, hash FROM ingestao WHERE fonte = ?", (caminho_csv,)
+    ).fetchone()
+
+    # Sem tabela, com um esquema diferente do declarado ou sem os agregados: reconstrói tudo
+    if not _esquema_valido(cursor) or not agregadosExistem(cursor):
+        registro = None
+
+    # 3. Nada mudou: não reconstrói o banco
+    if registro is not None and registro[0] == tamanho and registro[1] == mtime:
+        conn.close()
+        return "inalterado"
+
+    # 4. Confirma pelo conteúdo; o CSV pode ter sido apenas tocado ou ter crescido
+    prefixo = registro[0] if registro is not None and tamanho > registro[0] else None
+    hash_total, hash_prefixo = _impressao_digital(caminho_csv, prefixo)
+    if registro is not None and hash_total == registro[2]:
+        acao, offset = "inalterado", None
+    elif hash_prefixo is not None and hash_prefixo == registro[2]:
+        acao, offset = "incremental", registro[0]
+    else:
+        acao, offset = "completo", 0
+
+    def inserir(cursor, acumulador):
+        if offset is not None:
+            inserirBlocos(cursor, lerBlocos(caminho_csv, offset=offset), acumulador)
+
+    def registrar(cursor):
+        cursor.execute(
+            "INSERT OR REPLACE INTO ingestao (fonte, tamanho, mtime, hash) VALUES (?, ?, ?, ?)",
+            (caminho_csv, tamanho, mtime, hash_total),
+        )
+
+    # 5. Carrega os blocos e registra a impressão digital, numa única transação
+    _gravar_versao(conn, acao, inserir, registrar)
+    return acao
+
+
+def arquivosEntrada(caminho_dir):
+    return sorted(
+        os.path.join(caminho_dir, nome)
+        for nome in os.listdir(caminho_dir)
+        if nome.lower().endswith('.csv')
+    )
+
+
+def _preparar_arquivo(caminho, pasta):
+    # Roda num processo do pool: lê, normaliza as colunas, limpa e converte um
+    # arquivo bloco a bloco, gravando cada bloco pronto em `pasta`. Só o caminho
+    # dos blocos volta ao processo principal, nunca o quadro inteiro
+    hash_total, _ = _impressao_digital(caminho)
+    os.makedirs(pasta)
+    blocos = []
+    for numero, bloco in enumerate(lerBlocos(caminho)):
+        destino = os.path.join(pasta, f"{numero:06d}.pkl")
+        bloco.to_pickle(destino)
+        blocos.append(destino)
+    return hash_total, blocos
+
+
+def _ler_preparados(blocos):
+    # Um bloco por vez em memória; cada arquivo sai do disco depois de lido
+    for destino in blocos:
+        bloco = pd.read_pickle(destino)
+        os.remove(destino)
+        yield bloco
+
+
+def _contexto_processos():
+    # A ingestão roda numa thread do servidor (data/Ingestao.py): um fork de um
+    # processo com threads pode travar o filho num lock herdado (logging, pool de
+    # threads do pyarrow). O forkserver parte de um processo limpo; sem ele, spawn
+    metodos = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+
+
+def prepararArquivos(arquivos, pasta, trabalhadores=None):
+    # Prepara os arquivos em paralelo e os devolve na ordem, como (caminho, hash,
+    # blocos). Há no máximo 2 x trabalhadores arquivos em andamento: a memória e o
+    # disco ocupados não crescem com o tamanho do diretório
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    pendentes = iter(enumerate(arquivos))
+    em_andamento = deque()
+    shutil.rmtree(pasta, ignore_errors=True)
+    os.makedirs(pasta)
+    try:
+        with ProcessPoolExecutor(max_workers=trabalhadores, mp_context=_contexto_processos()) as pool:
+            def enviar():
+                for numero, caminho in itertools.islice(pendentes, 2 * trabalhadores - len(em_andamento)):
+                    destino = os.path.join(pasta, f"{numero:06d}")
+                    em_andamento.append((caminho, pool.submit(_preparar_arquivo, caminho, destino)))
+
+            enviar()
+            while em_andamento:
+                caminho, futuro = em_andamento.popleft()
+                hash_total, blocos = futuro.result()
+                enviar()
+                yield caminho, hash_total, _ler_preparados(blocos)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def _plano_diretorio(cursor, arquivos):
+    # Compara os arquivos do diretório com os registros de ingestao. Arquivos novos
+    # são acrescentados; um arquivo já ingerido que mudou ou sumiu exige recarregar tudo.
+    # Devolve (ação, arquivos a carregar, arquivos só tocados, impressões baratas)
+    registros = {
+        fonte: (tamanho, mtime, hash_total)
+        for fonte, tamanho, mtime, hash_total in cursor.execute("SELECT fonte, tamanho, mtime, hash FROM ingestao")
+    }
+    atuais = {}
+    for caminho in arquivos:
+        status = os.stat(caminho)
+        atuais[caminho] = (status.st_size, status.st_mtime)
+
+    if not _esquema_valido(cursor) or not agregadosExistem(cursor) or set(registros) - set(atuais):
+        return "completo", arquivos, [], atuais
+
+    tocados = []
+    for fonte, (tamanho, mtime, hash_total) in registros.items():
+        if atuais[fonte] == (tamanho, mtime):
+            continue
+        # Confirma pelo conteúdo, como no CSV único
+        if _impressao_digital(fonte)[0] != hash_total:
+            return "completo", arquivos, [], atuais
+        tocados.append(fonte)
+
+    novos = [caminho for caminho in arquivos if caminho not in registros]
+    return ("incremental" if novos else "inalterado"), novos, tocados, atuais
+
+
+def ingerirDiretorio(caminho_dir=ENTRADA_PATH, caminho_db=DB_PATH, trabalhadores=None):
+    # 1. Arquivos do diretório, em ordem estável
+    arquivos = arquivosEntrada(caminho_dir)
+
+    # 2. Conexão de escrita e plano da carga a partir dos registros de ingestao
+    conn = sqlite3.connect(caminho_db, isolation_level=None)
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode = WAL")
+    _criar_metadados(cursor)
+
+    acao, carregar, tocados, atuais = _plano_diretorio(cursor, arquivos)
+    if acao == "inalterado" and not tocados:
+        conn.close()
+        return acao
+
+    # 3. Os processos do pool leem e preparam os arquivos; esta conexão é a única
+    # que escreve, na ordem dos arquivos e numa única transação
+    hashes = {}
+
+    def inserir(cursor, acumulador):
+        if carregar:
+            for caminho, hash_total, blocos in prepararArquivos(carregar, f"{caminho_db}.blocos", trabalhadores):
+                inserirBlocos(cursor, blocos, acumulador)
+                hashes[caminho] = hash_total
+
+    # 4. Registra cada arquivo carregado; os só tocados atualizam tamanho e mtime
+    def registrar(cursor):
+        if acao == "completo":
+            cursor.execute("DELETE FROM ingestao")
+        cursor.executemany(
+            "INSERT OR REPLACE INTO ingestao (fonte, tamanho, mtime, hash) VALUES (?, ?, ?, ?)",
+            [(caminho, *atuais[caminho], hashes[caminho]) for caminho in carregar],
+        )
+        cursor.executemany(
+            "UPDATE ingestao SET tamanho = ?, mtime = ? WHERE fonte = ?",
+            [(*atuais[caminho], caminho) for caminho in tocados],
+        )
+
+    _gravar_versao(conn, acao, inserir, registrar)
+    return acao
+
+
+def versaoValida(caminho_db=DB_PATH):
+    # O banco publicado serve às páginas: existe, tem o esquema declarado e os
+    # agregados da versão atual do código (bancos antigos não servem)
+    if not os.path.exists(caminho_db):
+        return False
+    conn = sqlite3.connect(f"file:{os.path.abspath(caminho_db)}?mode=ro", uri=True)
+    try:
+        cursor = conn.cursor()
+        return _esquema_valido(cursor) and agregadosExistem(cursor)
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        conn.close()
 
-    # 8. Finaliza
-    conn.commit()
-    conn.close()
 
+def ingestaoPendente(fonte=CSV_PATH, caminho_db=DB_PATH):
+    # O mesmo teste barato de criarTable/ingerirDiretorio, numa conexão somente leitura;
+    # a fonte pode ser o CSV único ou o diretório de entrada
+    if not os.path.exists(caminho_db):
+        return True
+    conn = sqlite3.connect(f"file:{os.path.abspath(caminho_db)}?mode=ro", uri=True)
+    try:
+        cursor = conn.cursor()
+        try:
+            if os.path.isdir(fonte):
+                acao, _, tocados, _ = _plano_diretorio(cursor, arquivosEntrada(fonte))
+                pendente = acao != "inalterado" or bool(tocados)
+            else:
+                status = os.stat(fonte)
+                registro = cursor.execute(
+                    "SELECT tamanho, mtime FROM ingestao WHERE fonte = ?", (fonte,)
+                ).fetchone()
+                pendente = (
+                    registro != (status.st_size, status.st_mtime)
+                    or not _esquema_valido(cursor)
+                    or not agregadosExistem(cursor)
+                )
+        except sqlite3.OperationalError:
+            return True
+        return pendente
+    finally:
+        conn.close()
@@ -0,0 +1,122 @@
+# Esquema da tabela shopping, declarado uma única vez. Daqui saem a DDL do SQLite,
+# os dtypes e as colunas lidas do CSV e os domínios usados para validar as linhas.
+import pandas as pd
+
+# Sigla de cada estado: domínio de location e série do mapa (tabela estados)
+ESTADOS = {
+    'Alabama':'AL','Alaska':'AK','Arizona':'AZ','Arkansas':'AR','California':'CA',
+    'Colorado':'CO','Connecticut':'CT','Delaware':'DE','Florida':'FL','Georgia':'GA',
+    'Hawaii':'HI','Idaho':'ID','Illinois':'IL','Indiana':'IN','Iowa':'IA',
+    'Kansas':'KS','Kentucky':'KY','Louisiana':'LA','Maine':'ME','Maryland':'MD',
+    'Massachusetts':'MA','Michigan':'MI','Minnesota':'MN','Mississippi':'MS',
+    'Missouri':'MO','Montana':'MT','Nebraska':'NE','Nevada':'NV',
+    'New Hampshire':'NH','New Jersey':'NJ','New Mexico':'NM','New York':'NY',
+    'North Carolina':'NC','North Dakota':'ND','Ohio':'OH','Oklahoma':'OK',
+    'Oregon':'OR','Pennsylvania':'PA','Rhode Island':'RI','South Carolina':'SC',
+    'South Dakota':'SD','Tennessee':'TN','Texas':'TX','Utah':'UT','Vermont':'VT',
+    'Virginia':'VA','Washington':'WA','West Virginia':'WV','Wisconsin':'WI',
+    'Wyoming':'WY'
+}
+
+SIM_NAO = ('Yes', 'No')
+GENEROS = ('Male', 'Female')
+CODIGOS_GENERO = {genero: codigo for codigo, genero in enumerate(GENEROS)}
+METODOS_PAGAMENTO = ('Credit Card', 'Bank Transfer', 'Cash', 'PayPal', 'Venmo', 'Debit Card')
+
+# Compras por ano de cada frequência declarada; a ordem é a do eixo dos gráficos
+FREQUENCIA_ANUAL = {
+    'Weekly': 52,
+    'Bi-Weekly': 26,
+    'Fortnightly': 26,
+    'Monthly': 12,
+    'Quarterly': 4,
+    'Every 3 Months': 4,
+    'Annually': 1,
+}
+
+# (coluna, afinidade SQLite, tipo na leitura do CSV, domínio). O domínio é o
+# conjunto de valores aceitos (texto) ou a faixa (mínimo, máximo) (números);
+# None aceita qualquer valor. Colunas 'category' precisam de domínio: as
+# categorias são fixas, sem inferência bloco a bloco
+COLUNAS_ESQUEMA = [
+    ('customer_id', 'TEXT', 'str', None),
+    ('age', 'INTEGER', 'Int64', (0, 120)),
+    ('gender', 'TEXT', 'category', GENEROS),
+    ('item_purchased', 'TEXT', 'str', None),
+    ('category', 'TEXT', 'category', ('Clothing', 'Footwear', 'Outerwear', 'Accessories')),
+    ('purchase_amount_usd', 'REAL', 'float64', (0, None)),
+    ('location', 'TEXT', 'category', tuple(ESTADOS)),
+    ('size', 'TEXT', 'category', ('S', 'M', 'L', 'XL')),
+    ('color', 'TEXT', 'str', None),
+    ('season', 'TEXT', 'category', ('Winter', 'Spring', 'Summer', 'Fall')),
+    ('review_rating', 'REAL', 'float64', (0, 5)),
+    ('subscription_status', 'TEXT', 'category', SIM_NAO),
+    ('payment_method', 'TEXT', 'category', METODOS_PAGAMENTO),
+    ('shipping_type', 'TEXT', 'category', (
+        'Express', 'Free Shipping', 'Next Day Air', 'Standard', '2-Day Shipping', 'Store Pickup',
+    )),
+    ('discount_applied', 'TEXT', 'category', SIM_NAO),
+    ('promo_code_used', 'TEXT', 'category', SIM_NAO),
+    ('previous_purchases', 'INTEGER', 'Int64', (0, None)),
+    ('preferred_payment_method', 'TEXT', 'category', METODOS_PAGAMENTO),
+    ('frequency_of_purchases', 'TEXT', 'category', tuple(FREQUENCIA_ANUAL)),
+]
+
+# Colunas inteiras derivadas na ingestão: (coluna, coluna de origem, código de cada
+# valor). Os agregados e os filtros usam só aritmética sobre elas, sem comparar textos
+COLUNAS_DERIVADAS = [
+    ('annual_frequency', 'frequency_of_purchases', FREQUENCIA_ANUAL),
+    ('is_subscriber', 'subscription_status', {'Yes': 1, 'No': 0}),
+    ('has_discount', 'discount_applied', {'Yes': 1, 'No': 0}),
+    ('has_promo_code', 'promo_code_used', {'Yes': 1, 'No': 0}),
+    ('gender_code', 'gender', CODIGOS_GENERO),
+]
+
+# Colunas lidas do CSV e esquema da tabela shopping (coluna, afinidade SQLite),
+# que acrescenta as derivadas
+COLUNAS = [coluna for coluna, _, _, _ in COLUNAS_ESQUEMA]
+ESQUEMA = [(coluna, afinidade) for coluna, afinidade, _, _ in COLUNAS_ESQUEMA] + [
+    (coluna, 'INTEGER') for coluna, _, _ in COLUNAS_DERIVADAS
+]
+COLUNAS_TABELA = [coluna for coluna, _ in ESQUEMA]
+TIPOS_LEITURA = {coluna: tipo for coluna, _, tipo, _ in COLUNAS_ESQUEMA}
+DOMINIOS = {coluna: dominio for coluna, _, _, dominio in COLUNAS_ESQUEMA if dominio is not None}
+
+# dtypes do pandas.read_csv; um valor fora das categorias é lido como ausente
+DTYPES = {
+    coluna: pd.CategoricalDtype(DOMINIOS[coluna]) if tipo == 'category' else tipo
+    for coluna, tipo in TIPOS_LEITURA.items()
+}
+
+
+def dentroDosDominios(df):
+    # Máscara das linhas cujos valores respeitam os domínios declarados, e o
+    # número de linhas recusadas por coluna. Ausente conta como fora do domínio
+    validas = None
+    recusadas = {}
+    for coluna, dominio in DOMINIOS.items():
+        if coluna not in df.columns:
+            continue
+        serie = df[coluna]
+        if isinstance(dominio[0], str):
+            mascara = serie.isin(dominio)
+        else:
+            minimo, maximo = dominio
+            mascara = serie.notna()
+            if minimo is not None:
+                mascara &= serie >= minimo
+            if maximo is not None:
+                mascara &= serie <= maximo
+        mascara = mascara.fillna(False).astype(bool)
+        if not mascara.all():
+            recusadas[coluna] = int((~mascara).sum())
+        validas = mascara if validas is None else validas & mascara
+    return validas, recusadas
+
+
+def derivarColunas(df):
+    # Um lookup por categoria (o dicionário da coluna), não célula a célula;
+    # as linhas já passaram pela validação dos domínios
+    for coluna, origem, codigos in COLUNAS_DERIVADAS:
+        df[coluna] = df[origem].map(codigos).astype('int64')
+    return df
@@ -0,0 +1,173 @@
+# Gerador de dados sintéticos no formato de shopping_trends.csv, para medir o
+# app em volumes de produção (1M, 10M, 100M de linhas) sem depender de dados reais.
+#
+# O modelo é aprendido do CSV original: distribuições conjuntas para as colunas
+# que andam juntas (localização x categoria, gênero x assinatura x desconto x
+# cupom), o item condicionado à categoria e marginais empíricas para o resto
+# (idade, valor, temporada, frequência...). A amostragem é vetorizada com NumPy
+# e sai em blocos, direto para o disco, em CSV (cabeçalho original, ingerível
+# por criarTable) ou Parquet (colunas normalizadas).
+#
+# Reprodutível: o bloco i usa o gerador default_rng([semente, i]), então o mesmo
+# (linhas, semente) gera sempre o mesmo arquivo.
+#
+# Uso: python -m data.Gerador --linhas 10000000 --saida /tmp/shopping_10m.csv [--semente 42]
+import argparse
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from data.CriacaoDB import CSV_PATH, normalizarColuna
+from data.Esquema import COLUNAS
+
+TAMANHO_BLOCO = 500_000
+
+# Colunas sorteadas juntas; as que não aparecem aqui nem em CONDICIONAIS
+# seguem a marginal empírica de cada uma
+CONJUNTAS = [
+    ('location', 'category'),
+    ('gender', 'subscription_status', 'discount_applied', 'promo_code_used'),
+]
+
+# coluna -> coluna já sorteada de que ela depende
+CONDICIONAIS = {
+    'item_purchased': 'category',
+}
+
+
+@dataclass(frozen=True)
+class _Distribuicao:
+    # Valores observados (uma linha por combinação) e suas probabilidades
+    colunas: tuple
+    valores: tuple           # um array por coluna, alinhados
+    probabilidades: np.ndarray
+
+    def sortear(self, rng, n):
+        codigos = rng.choice(len(self.probabilidades), size=n, p=self.probabilidades)
+        return {coluna: valores[codigos] for coluna, valores in zip(self.colunas, self.valores)}
+
+
+@dataclass(frozen=True)
+class Modelo:
+    cabecalho: dict          # coluna normalizada -> nome no CSV original
+    conjuntas: list          # [_Distribuicao]
+    condicionais: dict       # coluna -> (coluna condicionante, {valor: _Distribuicao})
+
+
+def _distribuicao(df, colunas):
+    contagens = df.groupby(list(colunas), observed=True).size()
+    combinacoes = contagens.index.to_frame(index=False)
+    return _Distribuicao(
+        colunas=tuple(colunas),
+        valores=tuple(combinacoes[coluna].to_numpy() for coluna in colunas),
+        probabilidades=(contagens / contagens.sum()).to_numpy(),
+    )
+
+
+def aprenderModelo(caminho_csv=CSV_PATH):
+    # Lê o CSV de referência inteiro (é pequeno) e guarda só as tabelas de frequência
+    df = pd.read_csv(caminho_csv)
+    cabecalho = {normalizarColuna(nome): nome for nome in df.columns}
+    df.columns = list(cabecalho)
+    df = df.dropna()
+
+    agrupadas = {coluna for grupo in CONJUNTAS for coluna in grupo} | set(CONDICIONAIS) | {'customer_id'}
+    conjuntas = [_distribuicao(df, grupo) for grupo in CONJUNTAS]
+    conjuntas += [_distribuicao(df, (coluna,)) for coluna in COLUNAS if coluna not in agrupadas]
+
+    condicionais = {
+        coluna: (dada, {valor: _distribuicao(grupo, (coluna,)) for valor, grupo in df.groupby(dada)})
+        for coluna, dada in CONDICIONAIS.items()
+    }
+    return Modelo(cabecalho, conjuntas, condicionais)
+
+
+def _bloco(modelo, rng, n, primeiro_id):
+    colunas = {'customer_id': np.arange(primeiro_id, primeiro_id + n)}
+    for distribuicao in modelo.conjuntas:
+        colunas.update(distribuicao.sortear(rng, n))
+
+    for coluna, (dada, distribuicoes) in modelo.condicionais.items():
+        condicao = colunas[dada]
+        resultado = np.empty(n, dtype=object)
+        for valor, distribuicao in distribuicoes.items():
+            posicoes = np.flatnonzero(condicao == valor)
+            resultado[posicoes] = distribuicao.sortear(rng, len(posicoes))[coluna]
+        colunas[coluna] = resultado
+
+    return pd.DataFrame({coluna: colunas[coluna] for coluna in COLUNAS})
+
+
+def gerarBlocos(linhas, semente=42, modelo=None, primeiro_id=1, tamanho_bloco=TAMANHO_BLOCO):
+    # Quadros com as colunas normalizadas (COLUNAS), `tamanho_bloco` linhas por vez
+    modelo = modelo or aprenderModelo()
+    for numero, inicio in enumerate(range(0, linhas, tamanho_bloco)):
+        rng = np.random.default_rng([semente, numero])
+        n = min(tamanho_bloco, linhas - inicio)
+        yield _bloco(modelo, rng, n, primeiro_id + inicio)
+
+
+def gerarCsv(caminho, linhas, semente=42, modelo=None, primeiro_id=1):
+    # CSV com o cabeçalho do arquivo original, escrito bloco a bloco. Com o pyarrow
+    # instalado a escrita é feita por ele, várias vezes mais rápida que o to_csv
+    modelo = modelo or aprenderModelo()
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        pa = None
+
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write((','.join(modelo.cabecalho[coluna] for coluna in COLUNAS) + '\n').encode('utf-8'))
+        for bloco in gerarBlocos(linhas, semente, modelo, primeiro_id):
+            if pa is None:
+                arquivo.write(bloco.to_csv(index=False, header=False).encode('utf-8'))
+            else:
+                pacsv.write_csv(
+                    pa.Table.from_pandas(bloco, preserve_index=False),
+                    arquivo,
+                    pacsv.WriteOptions(include_header=False),
+                )
+    return linhas
+
+
+def gerarParquet(caminho, linhas, semente=42, modelo=None, primeiro_id=1):
+    # Um arquivo Parquet com as colunas normalizadas, um row group por bloco
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    try:
+        for bloco in gerarBlocos(linhas, semente, modelo, primeiro_id):
+            tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(caminho, tabela.schema)
+            escritor.write_table(tabela)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--linhas', type=int, default=1_000_000)
+    parser.add_argument('--saida', default='/tmp/shopping_sintetico.csv')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--referencia', default=CSV_PATH)
+    args = parser.parse_args()
+
+    modelo = aprenderModelo(args.referencia)
+    gerar = gerarParquet if args.saida.endswith('.parquet') else gerarCsv
+    inicio = time.perf_counter()
+    gerar(args.saida, args.linhas, args.semente, modelo)
+    tempo = time.perf_counter() - inicio
+    tamanho = os.path.getsize(args.saida) / 2**20
+    print(f"{args.linhas:,} linhas em {tempo:.1f} s ({args.linhas / tempo:,.0f} linhas/s), {tamanho:.0f} MB: {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+from data.Conexao import consultar
+
+ORDEM_TEMPORADAS = ['Winter', 'Spring', 'Summer', 'Fall']
+
+
+@dataclass(frozen=True)
+class IndicadoresDashboard:
+    # Tudo o que o Dashboard Geral exibe, calculado a partir da tabela resumo
+    faturamento_total: float
+    ticket_medio: float
+    media_review: float
+    percentual_ativos: float
+    freq_media_anual: float
+    produtos: pd.DataFrame          # item_purchased, quantidade
+    temporadas: pd.DataFrame        # season, avg_purchase, avg_review
+    categoria_genero: pd.DataFrame  # category, gender, total
+
+    @property
+    def percent_satisfacao(self):
+        return self.media_review / 5
+
+
+def indicadoresDashboard():
+    # Uma única leitura da tabela resumo, mantida pela ingestão; nenhuma varredura de shopping
+    resumo = consultar("SELECT * FROM resumo")
+
+    def fatia(dimensao):
+        return resumo[resumo['dimensao'] == dimensao]
+
+    total = fatia('total').iloc[0]
+
+    produtos = (
+        fatia('item_purchased')[['valor', 'n']]
+        .rename(columns={'valor': 'item_purchased', 'n': 'quantidade'})
+        .sort_values('quantidade', ascending=False)
+    )
+
+    temporadas = fatia('season')
+    temporadas = pd.DataFrame({
+        'season': pd.Categorical(temporadas['valor'], categories=ORDEM_TEMPORADAS, ordered=True),
+        'avg_purchase': temporadas['soma_valor'] / temporadas['n'],
+        'avg_review': temporadas['soma_avaliacao'] / temporadas['n'],
+    }).sort_values('season')
+
+    categoria_genero = (
+        fatia('category_gender')[['valor', 'subvalor', 'soma_valor']]
+        .rename(columns={'valor': 'category', 'subvalor': 'gender', 'soma_valor': 'total'})
+    )
+
+    return IndicadoresDashboard(
+        faturamento_total=total['soma_valor'],
+        ticket_medio=total['soma_valor'] / total['n'],
+        media_review=total['soma_avaliacao'] / total['n'],
+        percentual_ativos=total['assinantes'] / total['n'] if total['n'] > 0 else 0,
+        freq_media_anual=total['soma_freq_anual'] / total['n_freq'],
+        produtos=produtos.reset_index(drop=True),
+        temporadas=temporadas.reset_index(drop=True),
+        categoria_genero=categoria_genero.reset_index(drop=True),
+    )
+
+
+@dataclass(frozen=True)
+class IndicadoresConsumidor:
+    # KPIs do Perfil do Consumidor, também da tabela resumo; None sem dados
+    faturamento_total: float
+    ticket_medio: float
+    decada_predominante: int | None   # início da década de idade mais numerosa
+    genero_predominante: str | None   # valor de gender (data/Esquema.py)
+
+
+def indicadoresConsumidor():
+    resumo = consultar(
+        "SELECT dimensao, valor, subvalor, n, soma_valor FROM resumo "
+        "WHERE dimensao IN ('total', 'age_decade', 'category_gender')"
+    )
+
+    def fatia(dimensao):
+        return resumo[resumo['dimensao'] == dimensao]
+
+    total = fatia('total')
+    if total.empty or not total['n'].iloc[0]:
+        return IndicadoresConsumidor(0.0, 0.0, None, None)
+    total = total.iloc[0]
+
+    decadas = fatia('age_decade').set_index('valor')['n']
+    generos = fatia('category_gender').groupby('subvalor')['n'].sum()
+    return IndicadoresConsumidor(
+        faturamento_total=total['soma_valor'],
+        ticket_medio=total['soma_valor'] / total['n'],
+        decada_predominante=int(decadas.idxmax()),
+        genero_predominante=generos.idxmax(),
+    )
@@ -0,0 +1,166 @@
+# Serviço de ingestão em segundo plano, fora do caminho das requisições.
+# Uma thread por processo observa a fonte (o diretório de entrada, se existir, ou
+# o CSV único); quando ela muda, a nova versão do banco é montada num arquivo ao
+# lado (cópia do banco publicado + criarTable/ingerirDiretorio) e trocada
+# no lugar com os.replace. Os leitores continuam na versão antiga até a troca;
+# o pool de data/Conexao.py reabre as conexões quando o arquivo muda.
+#
+# O banco publicado fica em journal_mode DELETE: ninguém escreve nele depois da
+# troca, e não sobra um -wal que pertença a outra versão do arquivo.
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from data.CriacaoDB import (
+    CSV_PATH,
+    DB_PATH,
+    ENTRADA_PATH,
+    criarTable,
+    ingerirDiretorio,
+    ingestaoPendente,
+    versaoValida,
+)
+
+INTERVALO_S = float(os.environ.get("SHOPPING_INTERVALO_INGESTAO", "5"))
+
+_log = logging.getLogger(__name__)
+
+
+def _remover(*caminhos):
+    for caminho in caminhos:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+
+def _fonte():
+    return ENTRADA_PATH if os.path.isdir(ENTRADA_PATH) else CSV_PATH
+
+
+def publicarVersao(fonte=CSV_PATH, caminho_db=DB_PATH):
+    # Monta a próxima versão em <banco>.novo e a publica; devolve o estado da carga
+    novo = f"{caminho_db}.novo"
+    _remover(novo, f"{novo}-wal", f"{novo}-shm")
+
+    # 1. Parte do banco publicado: a ingestão incremental continua valendo
+    if os.path.exists(caminho_db):
+        origem = sqlite3.connect(f"file:{os.path.abspath(caminho_db)}?mode=ro", uri=True)
+        destino = sqlite3.connect(novo)
+        try:
+            origem.backup(destino)
+        finally:
+            destino.close()
+            origem.close()
+
+    try:
+        # 2. Carga no arquivo ao lado
+        if os.path.isdir(fonte):
+            estado = ingerirDiretorio(fonte, novo)
+        else:
+            estado = criarTable(fonte, novo)
+        # Mesmo "inalterado" é publicado: a carga regravou a impressão digital da
+        # fonte (um CSV só tocado ganha mtime novo), e sem ela ingestaoPendente
+        # continuaria verdadeiro a cada início. user_version não muda, e o cache
+        # de resultados segue válido.
+
+        # 3. Sai do WAL: o arquivo publicado é autocontido
+        conn = sqlite3.connect(novo)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.close()
+
+        # 4. Troca atômica; o -wal/-shm de um banco antigo em WAL não vale para o novo
+        os.replace(novo, caminho_db)
+        _remover(f"{caminho_db}-wal", f"{caminho_db}-shm")
+        return estado
+    finally:
+        _remover(novo, f"{novo}-wal", f"{novo}-shm")
+
+
+class _Servico:
+
+    def __init__(self, fonte, caminho_db):
+        self.fonte = fonte
+        self.caminho_db = caminho_db
+        self.pronto = threading.Event()
+        self.erro = None
+        self._visto = None
+
+    def _assinatura(self):
+        if os.path.isdir(self.fonte):
+            return tuple(
+                (entrada.name, entrada.stat().st_size, entrada.stat().st_mtime_ns)
+                for entrada in sorted(os.scandir(self.fonte), key=lambda entrada: entrada.name)
+            )
+        status = os.stat(self.fonte)
+        return status.st_size, status.st_mtime_ns
+
+    def _verificar(self):
+        assinatura = self._assinatura()
+        if assinatura == self._visto:
+            return
+        if ingestaoPendente(self.fonte, self.caminho_db):
+            estado = publicarVersao(self.fonte, self.caminho_db)
+            _log.info("Nova versão do banco publicada (%s)", estado)
+        # Só depois da publicação: uma carga que falhou é tentada de novo na próxima volta
+        self._visto = assinatura
+
+    def executar(self):
+        while True:
+            try:
+                self._verificar()
+                self.erro = None
+            except Exception as erro:
+                _log.exception("Falha na ingestão de %s", self.fonte)
+                self.erro = erro
+            # Libera as páginas assim que existe uma versão válida publicada (ou a carga falhou)
+            if self.erro is not None or _publicada(self.caminho_db):
+                self.pronto.set()
+            time.sleep(INTERVALO_S)
+
+
+_validade = None
+
+
+def _publicada(caminho_db):
+    # versaoValida do arquivo publicado, memorizada pela identidade do arquivo: a
+    # troca por os.replace muda o inode, e só então o esquema é lido de novo
+    global _validade
+    try:
+        status = os.stat(caminho_db)
+    except FileNotFoundError:
+        return False
+    assinatura = (status.st_ino, status.st_mtime_ns, status.st_size)
+    atual = _validade
+    if atual is None or atual[0] != assinatura:
+        atual = _validade = (assinatura, versaoValida(caminho_db))
+    return atual[1]
+
+
+_servico = None
+_servico_lock = threading.Lock()
+
+
+def iniciarIngestao():
+    # Sobe o serviço uma vez por processo; chamadas seguintes só devolvem o mesmo
+    global _servico
+    if _servico is None:
+        with _servico_lock:
+            if _servico is None:
+                servico = _Servico(_fonte(), DB_PATH)
+                threading.Thread(target=servico.executar, name="ingestao", daemon=True).start()
+                _servico = servico
+    return _servico
+
+
+def aguardarPrimeiraVersao(timeout=None):
+    # Espera enquanto não houver uma versão válida publicada: sem banco, ou com um
+    # banco de uma versão anterior do esquema/agregados, que a ingestão reconstrói
+    servico = iniciarIngestao()
+    if _publicada(servico.caminho_db):
+        return
+    servico.pronto.wait(timeout)
+    if not _publicada(servico.caminho_db):
+        raise RuntimeError(f"Nenhuma versão válida do banco publicada em {servico.caminho_db}") from servico.erro
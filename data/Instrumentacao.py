@@ -0,0 +1,176 @@
+# Instrumentação opcional das consultas, das figuras e dos reruns das páginas.
+#
+# Desligada por padrão; SHOPPING_INSTRUMENTACAO=1 liga. Desligada, os
+# decoradores devolvem a própria função e medirRerun devolve um contexto vazio:
+# o caminho das consultas fica exatamente como sem a instrumentação.
+#
+# Ligada, registra um evento por:
+#   consulta - execução no SQLite (uma falta do cache de resultados): SQL,
+#              parâmetros, latência, linhas devolvidas e o plano (EXPLAIN QUERY
+#              PLAN, obtido uma vez por SQL); varredura=True quando o plano tem
+#              um SCAN de tabela, com ou sem índice
+#   figura   - construção de uma figura memorizada (frontend/graficos.py)
+#   grafico  - envio de uma figura ao navegador (frontend/componentes.mostrarGrafico)
+#   rerun    - página, tempo total, consultas, figuras, gráficos e acertos/faltas
+#              do cache de resultados (data/Cache.py) durante o rerun. Os
+#              contadores do cache são do processo: com várias sessões rodando
+#              ao mesmo tempo, a taxa de acertos de um rerun é aproximada
+#
+# Cada evento é uma linha JSON em SHOPPING_METRICAS, para um coletor externo ler;
+# os últimos reruns ficam em memória para o painel da barra lateral
+# (frontend/componentes.py).
+import functools
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+from data.Cache import cache
+
+ATIVA = os.environ.get("SHOPPING_INSTRUMENTACAO", "0") not in ("", "0")
+METRICAS_PATH = os.environ.get("SHOPPING_METRICAS", "data/metricas.jsonl")
+HISTORICO = 200
+
+# SCAN de uma tabela do banco; SCAN CONSTANT ROW e subconsultas não contam
+_VARREDURA = re.compile(r'^SCAN (?!CONSTANT ROW)\w')
+
+_planos = {}
+_historico = deque(maxlen=HISTORICO)
+_ids = itertools.count(1)
+_local = threading.local()
+_arquivo = None
+_arquivo_lock = threading.Lock()
+
+
+def _gravar(evento):
+    global _arquivo
+    linha = json.dumps(evento, default=str, ensure_ascii=False)
+    with _arquivo_lock:
+        if _arquivo is None:
+            pasta = os.path.dirname(METRICAS_PATH)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            _arquivo = open(METRICAS_PATH, "a", buffering=1, encoding="utf-8")
+        _arquivo.write(linha + "\n")
+
+
+def _registrar(tipo, **dados):
+    # Grava o evento e o anexa ao rerun em andamento nesta thread, se houver
+    rerun = getattr(_local, "rerun", None)
+    evento = {"ts": round(time.time(), 3), "tipo": tipo, "rerun": rerun and rerun["id"], **dados}
+    if rerun is not None:
+        rerun.setdefault(tipo, []).append(evento)
+    _gravar(evento)
+    return evento
+
+
+def _plano(sql, params):
+    # O plano depende só do SQL (e das estatísticas do ANALYZE): um EXPLAIN por texto
+    plano = _planos.get(sql)
+    if plano is None:
+        from data.Conexao import conexao
+
+        with conexao() as conn:
+            plano = [detalhe for _, _, _, detalhe in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        _planos[sql] = plano
+    return plano
+
+
+def _linhas(resultado):
+    if resultado is None:
+        return 0
+    if isinstance(resultado, tuple):
+        # fetchone: uma linha
+        return 1
+    return len(resultado)
+
+
+def instrumentarConsulta(executar):
+    # Decorador das funções (sql, params) -> resultado de data/Conexao.py
+    if not ATIVA:
+        return executar
+
+    @functools.wraps(executar)
+    def medido(sql, params):
+        inicio = time.perf_counter()
+        resultado = executar(sql, params)
+        ms = (time.perf_counter() - inicio) * 1000
+        plano = _plano(sql, params)
+        _registrar(
+            "consulta",
+            sql=" ".join(sql.split()),
+            params=list(params),
+            ms=round(ms, 3),
+            linhas=_linhas(resultado),
+            plano=plano,
+            varredura=any(_VARREDURA.match(detalhe) for detalhe in plano),
+        )
+        return resultado
+    return medido
+
+
+def medirFigura(grafico, construir):
+    # Envolve a construção de uma figura memorizada; só roda numa falta do cache
+    if not ATIVA:
+        return construir
+
+    def medido():
+        inicio = time.perf_counter()
+        fig = construir()
+        _registrar("figura", grafico=grafico, ms=round((time.perf_counter() - inicio) * 1000, 3))
+        return fig
+    return medido
+
+
+def registrarGrafico(nome, ms):
+    _registrar("grafico", grafico=nome, ms=round(ms, 3))
+
+
+@contextmanager
+def _medir_rerun(pagina):
+    rerun = _local.rerun = {"id": next(_ids), "pagina": pagina}
+    acertos, faltas = cache.acertos, cache.faltas
+    inicio = time.perf_counter()
+    try:
+        yield rerun
+    finally:
+        _local.rerun = None
+        consultas = rerun.get("consulta", [])
+        rerun.update(
+            ms=round((time.perf_counter() - inicio) * 1000, 3),
+            consultas=len(consultas),
+            ms_consultas=round(sum(c["ms"] for c in consultas), 3),
+            linhas=sum(c["linhas"] for c in consultas),
+            varreduras=sum(c["varredura"] for c in consultas),
+            figuras=len(rerun.get("figura", [])),
+            graficos=len(rerun.get("grafico", [])),
+            acertos_cache=cache.acertos - acertos,
+            faltas_cache=cache.faltas - faltas,
+        )
+        _gravar({
+            "ts": round(time.time(), 3),
+            "tipo": "rerun",
+            **{chave: valor for chave, valor in rerun.items() if chave not in ("consulta", "figura", "grafico")},
+        })
+        _historico.append(rerun)
+        _local.ultimo = rerun
+
+
+def medirRerun(pagina):
+    # Contexto em volta da execução da página (main.py)
+    if not ATIVA:
+        return nullcontext()
+    return _medir_rerun(pagina)
+
+
+def ultimoRerun():
+    # O último rerun concluído nesta thread, isto é, nesta sessão
+    return getattr(_local, "ultimo", None)
+
+
+def historico():
+    return list(_historico)
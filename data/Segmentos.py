@@ -0,0 +1,84 @@
+# Motor de comparação de segmentos: divide shopping em dois grupos por um
+# indicador 0/1 (desconto, cupom, assinatura) e compara as medidas dos grupos,
+# no total e por valor de cada dimensão pedida. As células (contagem e somas)
+# são materializadas na ingestão, na tabela segmentos (data/Agregados.py): a
+# comparação é um SELECT de poucas linhas, e as médias saem delas. Só os
+# clientes únicos, que não são aditivos entre células, leem shopping.
+from dataclasses import dataclass
+
+import pandas as pd
+
+from data.Agregados import DIMENSOES_SEGMENTOS, DIVISOES_SEGMENTOS, MEDIDAS_SEGMENTOS
+from data.Conexao import consultar
+
+# Divisões aceitas: nome -> indicador derivado na ingestão (data/Esquema.py)
+DIVISOES = DIVISOES_SEGMENTOS
+
+# Dimensões que podem abrir a comparação
+DIMENSOES = DIMENSOES_SEGMENTOS
+
+# Medidas aditivas por célula (segmento x dimensão); as médias são razões delas
+MEDIDAS = [medida for medida, _, _, _ in MEDIDAS_SEGMENTOS]
+
+
+@dataclass(frozen=True)
+class ComparacaoSegmentos:
+    divisao: str
+    dimensoes: tuple
+    celulas: pd.DataFrame   # segmento (bool), dimensao, valor, medidas
+    clientes: pd.Series     # clientes únicos por segmento
+
+    def resumo(self):
+        # Uma linha por segmento: contagem, médias e clientes únicos
+        total = self.celulas[self.celulas['dimensao'] == 'total'].groupby('segmento')[MEDIDAS].sum()
+        return pd.DataFrame({
+            'n': total['n'],
+            'ticket_medio': total['soma_valor'] / total['n'],
+            'media_avaliacao': total['soma_avaliacao'] / total['n'],
+            'media_compras_anteriores': total['soma_compras_anteriores'] / total['n'],
+            'clientes': self.clientes.reindex(total.index, fill_value=0),
+        })
+
+    def por(self, dimensao, medida='n'):
+        # Medida por valor da dimensão (linhas) e segmento (colunas)
+        if dimensao not in self.dimensoes:
+            raise ValueError(f"Dimensão fora da comparação: {dimensao}")
+        return self.celulas[self.celulas['dimensao'] == dimensao].pivot_table(
+            index='valor', columns='segmento', values=medida, aggfunc='sum', fill_value=0
+        ).rename_axis(index=dimensao)
+
+    def mediaPor(self, dimensao, medida):
+        # Média de uma medida por valor da dimensão e segmento
+        return self.por(dimensao, medida) / self.por(dimensao, 'n')
+
+
+def compararSegmentos(divisao, dimensoes=('season', 'category'), contar_clientes=True):
+    # As células saem da tabela segmentos; clientes únicos, de um GROUP BY só
+    # pelo indicador sobre shopping
+    indicador = DIVISOES[divisao]
+    dimensoes = tuple(dimensoes)
+    desconhecidas = set(dimensoes) - set(DIMENSOES)
+    if desconhecidas:
+        raise ValueError(f"Dimensões não suportadas: {sorted(desconhecidas)}")
+
+    celulas = consultar(
+        f"""
+        SELECT segmento, dimensao, valor, {', '.join(MEDIDAS)}
+        FROM segmentos
+        WHERE divisao = ? AND dimensao IN ({', '.join('?' * (len(dimensoes) + 1))})
+        """,
+        (divisao, 'total', *dimensoes),
+    )
+    celulas['segmento'] = celulas['segmento'] == '1'
+
+    if contar_clientes:
+        clientes = consultar(f"""
+            SELECT {indicador} AS segmento, COUNT(DISTINCT customer_id) AS clientes
+            FROM shopping
+            GROUP BY segmento
+        """)
+        clientes = clientes.set_index(clientes['segmento'].astype(bool))['clientes']
+    else:
+        clientes = pd.Series(dtype='int64')
+
+    return ComparacaoSegmentos(divisao, dimensoes, celulas, clientes)
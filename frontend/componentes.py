@@ -0,0 +1,167 @@
+# Componentes visuais compartilhados pelas páginas.
+#
+# Os KPIs de uma página saem num único st.markdown: o painel inteiro (todas as
+# linhas de cartões) é um bloco HTML/CSS só, então o navegador recebe uma
+# mensagem em vez de uma por cartão. Os templates são compilados uma vez, na
+# importação; as páginas passam os valores crus do motor de indicadores e o
+# formato de cada um.
+import html
+import time
+from dataclasses import dataclass
+from string import Template
+
+import pandas as pd
+import streamlit as st
+
+from data import Instrumentacao
+from data.Instrumentacao import historico, registrarGrafico, ultimoRerun
+
+FUNDO_VERDE = "linear-gradient(to top, #d0f0c0, #b0e57c)"
+FUNDO_AZUL = "linear-gradient(to bottom, #4d94d4, #cceeff)"
+
+_ESTILO = """
+<style>
+.kpi-linha { display: grid; gap: 1rem; margin-bottom: 10px; }
+.kpi-cartao {
+    padding: 20px;
+    border-radius: 10px;
+    text-align: center;
+    box-shadow: 0 2px 5px rgba(0,0,0,0.1);
+    font-family: Arial, sans-serif;
+}
+.kpi-titulo { font-size: 18px; font-weight: 500; color: #333; }
+.kpi-valor { font-size: 24px; margin: 5px 0 0 0; font-weight: bold; }
+.kpi-delta { font-size: 14px; font-weight: 600; margin-top: 4px; }
+.kpi-ajuda { font-size: 12px; color: gray; margin-top: 4px; }
+</style>
+"""
+
+_PAINEL = Template("$estilo<div class='kpi-painel'>$linhas</div>")
+_LINHA = Template("<div class='kpi-linha' style='grid-template-columns: repeat($colunas, 1fr);'>$cartoes</div>")
+_CARTAO = Template(
+    "<div class='kpi-cartao' style='background: $fundo;'>"
+    "<div class='kpi-titulo'>$titulo</div>"
+    "<p class='kpi-valor'>$valor</p>"
+    "$delta$ajuda"
+    "</div>"
+)
+_DELTA = Template("<div class='kpi-delta' style='color: $cor;'>$texto</div>")
+_AJUDA = Template("<div class='kpi-ajuda'>$texto</div>")
+
+
+@dataclass(frozen=True)
+class Kpi:
+    # Um cartão: valor cru e formato (str.format), além da variação opcional
+    titulo: str
+    valor: object
+    formato: str = "{}"
+    fundo: str = FUNDO_AZUL
+    delta: float | None = None
+    formato_delta: str = "{:+.1f}%"
+    ajuda: str | None = None
+
+
+def _texto(kpi):
+    if kpi.valor is None:
+        return "N/A"
+    return kpi.formato.format(kpi.valor)
+
+
+def _cartao(kpi):
+    delta = ''
+    if kpi.delta is not None:
+        cor = '#2BAB4D' if kpi.delta > 0 else '#B61E1B' if kpi.delta < 0 else 'gray'
+        delta = _DELTA.substitute(cor=cor, texto=html.escape(kpi.formato_delta.format(kpi.delta)))
+    ajuda = _AJUDA.substitute(texto=html.escape(kpi.ajuda)) if kpi.ajuda else ''
+    return _CARTAO.substitute(
+        fundo=kpi.fundo,
+        titulo=html.escape(kpi.titulo),
+        valor=html.escape(_texto(kpi)),
+        delta=delta,
+        ajuda=ajuda,
+    )
+
+
+def htmlKpis(*linhas):
+    # HTML do painel: cada argumento é uma linha (lista de Kpi)
+    return _PAINEL.substitute(
+        estilo=_ESTILO,
+        linhas=''.join(
+            _LINHA.substitute(colunas=len(linha), cartoes=''.join(_cartao(kpi) for kpi in linha))
+            for linha in linhas if linha
+        ),
+    )
+
+
+def painelKpis(*linhas, destino=None):
+    # Renderiza todas as linhas num único elemento; `destino` permite escrever
+    # num lugar reservado antes (st.empty(), coluna, container)
+    (destino or st).markdown(htmlKpis(*linhas), unsafe_allow_html=True)
+
+
+def _nome_grafico(fig):
+    # Título da figura ou, sem ele, os tipos dos traços
+    titulo = getattr(getattr(getattr(fig, 'layout', None), 'title', None), 'text', None)
+    if titulo:
+        return titulo
+    return '+'.join(dict.fromkeys(getattr(trace, 'type', '?') for trace in getattr(fig, 'data', ()))) or '?'
+
+
+def mostrarGrafico(fig, destino=st, **kwargs):
+    # plotly_chart no destino (st, coluna, container); com a instrumentação ligada
+    # (data/Instrumentacao.py), mede a serialização da figura e o envio ao navegador
+    if not Instrumentacao.ATIVA:
+        return destino.plotly_chart(fig, **kwargs)
+    inicio = time.perf_counter()
+    try:
+        return destino.plotly_chart(fig, **kwargs)
+    finally:
+        registrarGrafico(_nome_grafico(fig), (time.perf_counter() - inicio) * 1000)
+
+
+def abasPreguicosas(abas, key, **kwargs):
+    # st.tabs em que só a aba aberta roda: `abas` é {rótulo: função sem argumentos
+    # que desenha o conteúdo}. Com on_change="rerun" cada aba sabe se está aberta
+    # (.open) e trocar de aba dispara um rerun; o que a aba desenha continua no
+    # cache de resultados/figuras, então voltar a uma aba já vista é barato.
+    # Quando o estado não é rastreado (.open é None), todas as abas rodam
+    conteineres = st.tabs(list(abas), key=key, on_change="rerun", **kwargs)
+    for desenhar, aba in zip(abas.values(), conteineres):
+        if aba.open is False:
+            continue
+        with aba:
+            desenhar()
+    return conteineres
+
+
+def painelDesempenho():
+    # Painel de depuração na barra lateral: o último rerun desta sessão e os
+    # tempos por página dos reruns recentes do processo
+    rerun = ultimoRerun()
+    if rerun is None:
+        return
+    with st.sidebar.expander("⏱️ Desempenho", expanded=False):
+        pedidos = rerun['acertos_cache'] + rerun['faltas_cache']
+        taxa = f"{rerun['acertos_cache'] / pedidos:.0%}" if pedidos else "N/A"
+        st.caption(
+            f"{rerun['pagina']}: {rerun['ms']:.0f} ms · {rerun['consultas']} consulta(s) em "
+            f"{rerun['ms_consultas']:.0f} ms · {rerun['linhas']:,} linha(s) · "
+            f"{rerun['varreduras']} varredura(s) · cache {taxa} de {pedidos}"
+        )
+        consultas = rerun.get('consulta')
+        if consultas:
+            st.dataframe(
+                pd.DataFrame(consultas)[['ms', 'linhas', 'varredura', 'sql']].sort_values('ms', ascending=False),
+                hide_index=True,
+            )
+        graficos = rerun.get('figura', []) + rerun.get('grafico', [])
+        if graficos:
+            st.dataframe(
+                pd.DataFrame(graficos)[['tipo', 'grafico', 'ms']].sort_values('ms', ascending=False),
+                hide_index=True,
+            )
+        reruns = pd.DataFrame(historico())
+        if not reruns.empty:
+            st.dataframe(
+                reruns.groupby('pagina')['ms'].describe(percentiles=[0.5, 0.95])[['count', '50%', '95%', 'max']],
+            )
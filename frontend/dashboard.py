@@ -1,215 +1,144 @@
-import sqlite3
-import pandas as pd
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 
-st.markdown(f"<h1 style='text-align: center;'>📊 Dashboard Geral</h1>", unsafe_allow_html=True)
-
-conn = sqlite3.connect("data/shopping.db")
-cursor = conn.cursor()
-
-#------------------------------------KPI TICKET----------------------------------------
-cursor.execute("""
-SELECT AVG(purchase_amount_usd) AS ticket_medio
-FROM shopping
-""")
-ticket_medio = cursor.fetchone()[0]
-#------------------------------------KPI FATURAMENTO----------------------------------------
-cursor.execute("""
-SELECT SUM(purchase_amount_usd) AS faturamento_total
-FROM shopping
-""")
-faturamento_total = cursor.fetchone()[0]
-#------------------------------------KPI REVIEW----------------------------------------
-cursor.execute("""
-SELECT AVG(review_rating) AS media_review
-FROM shopping
-""")
-media_review = cursor.fetchone()[0]
-percent_satisfacao = (media_review / 5)
-#------------------------------------KPI ASSINATURAS----------------------------------------
-cursor.execute("""
-SELECT 
-  COUNT(*) AS total,
-  SUM(CASE WHEN subscription_status = 'Yes' THEN 1 ELSE 0 END) AS ativos
-FROM shopping
-""")
-total, ativos = cursor.fetchone()
-percentual_ativos = ativos / total if total > 0 else 0
-#------------------------------------KPI FREQUENCIA----------------------------------------
-cursor.execute("""
-SELECT 
-  AVG(
-    CASE 
-      WHEN frequency_of_purchases = 'Weekly' THEN 52
-      WHEN frequency_of_purchases = 'Bi-Weekly' THEN 26
-      WHEN frequency_of_purchases = 'Fortnightly' THEN 26
-      WHEN frequency_of_purchases = 'Monthly' THEN 12
-      WHEN frequency_of_purchases = 'Quarterly' THEN 4
-      WHEN frequency_of_purchases = 'Every 3 Months' THEN 4
-      WHEN frequency_of_purchases = 'Annually' THEN 1
-      ELSE NULL
-    END
-  ) AS freq_media_anual
-FROM shopping
-""")
-freq_media_anual = cursor.fetchone()[0]
-#----------------------------------------------------------------------------
-col1, col2= st.columns(2)
-col3, col4, col = st.columns(3)
-
-def kpi_box(title, value, gradient_css):
-    return f"""
-    <div style="
-        background: {gradient_css};
-        padding: 20px;
-        border-radius: 10px;
-        text-align: center;
-        box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-        font-family: Arial, sans-serif;
-        margin-bottom: 10px;
-    ">
-        <div style="font-size: 18px; font-weight: 500; color: #333;">{title}</div>
-        <p style='font-size: 24px; margin: 5px 0 0 0; font-weight: bold;'>{value}</p>
-    </div>
-    """
-
+from data.Correlacao import correlacao
+from data.Indicadores import indicadoresDashboard
+from frontend.componentes import FUNDO_VERDE, Kpi, mostrarGrafico, painelKpis
+from frontend.graficos import figuraMemorizada
 
-with col1:
-    st.markdown(kpi_box("Faturamento Total", f"USD {faturamento_total:.2f}", "linear-gradient(to top, #d0f0c0, #b0e57c)"), unsafe_allow_html=True)
-
-
-with col2:
-    st.markdown(kpi_box("Ticket Médio", f"USD {ticket_medio:.2f}", "linear-gradient(to top, #d0f0c0, #b0e57c)"), unsafe_allow_html=True)
-
-with col3:
-    st.markdown(kpi_box("Satisfação Média", f"{percent_satisfacao:.2%}", "linear-gradient(to bottom, #4d94d4, #cceeff)"), unsafe_allow_html=True)
+st.markdown(f"<h1 style='text-align: center;'>📊 Dashboard Geral</h1>", unsafe_allow_html=True)
 
-with col4:
-    st.markdown(kpi_box("Adoção de Assinaturas", f"{percentual_ativos:.2%}", "linear-gradient(to bottom, #4d94d4, #cceeff)"), unsafe_allow_html=True)
+#------------------------------------KPIs----------------------------------------
+# Todos os números da página vêm do motor de indicadores (tabela resumo)
+indicadores = indicadoresDashboard()
 
-with col:
-    st.markdown(kpi_box("Freq. Média de Compras Anual", f"{freq_media_anual:.1f}", "linear-gradient(to bottom, #4d94d4, #cceeff)"), unsafe_allow_html=True)
+ticket_medio = indicadores.ticket_medio
+faturamento_total = indicadores.faturamento_total
+percent_satisfacao = indicadores.percent_satisfacao
+percentual_ativos = indicadores.percentual_ativos
+freq_media_anual = indicadores.freq_media_anual
+#----------------------------------------------------------------------------
+painelKpis(
+    [
+        Kpi("Faturamento Total", faturamento_total, "USD {:.2f}", FUNDO_VERDE),
+        Kpi("Ticket Médio", ticket_medio, "USD {:.2f}", FUNDO_VERDE),
+    ],
+    [
+        Kpi("Satisfação Média", percent_satisfacao, "{:.2%}"),
+        Kpi("Adoção de Assinaturas", percentual_ativos, "{:.2%}"),
+        Kpi("Freq. Média de Compras Anual", freq_media_anual, "{:.1f}"),
+    ],
+)
 st.subheader("",  divider = True)
 
 #---------------------------------BAR PRODUTOS-------------------------------------------
-query_bar = """
-SELECT item_purchased, COUNT(*) AS quantidade
-FROM shopping
-GROUP BY item_purchased
-ORDER BY quantidade DESC
-"""
-df_bar = pd.read_sql_query(query_bar, conn)
-
-fig_bar = px.bar(
-    df_bar,
-    x="item_purchased",
-    y="quantidade",
-    labels={"item_purchased": "Produto", "quantidade": "Quantidade"},
-    color="quantidade",
-    color_continuous_scale="Blues"
-)
+@figuraMemorizada('dashboard.produtos')
+def figura_produtos():
+    df_bar = indicadores.produtos
+
+    fig_bar = px.bar(
+        df_bar,
+        x="item_purchased",
+        y="quantidade",
+        labels={"item_purchased": "Produto", "quantidade": "Quantidade"},
+        color="quantidade",
+        color_continuous_scale="Blues"
+    )
+    return fig_bar
+
 
 with st.container(border=True):
     st.markdown("<h3 style='text-align: center;'>Gráfico de Barras:<br> Produtos Mais Comprados</h3>", unsafe_allow_html=True)
-    st.plotly_chart(fig_bar, use_container_width=True)
+    mostrarGrafico(figura_produtos(), use_container_width=True)
 #---------------------------------RADAR CHART-------------------------------------------
-query_radar = """
-SELECT season,
-       AVG(purchase_amount_usd) AS avg_purchase,
-       AVG(review_rating) AS avg_review
-FROM shopping
-GROUP BY season
-"""
-df_radar = pd.read_sql_query(query_radar, conn)
-
-ordem_temporadas = ['Winter', 'Spring', 'Summer', 'Fall']
-df_radar['season'] = pd.Categorical(df_radar['season'], categories=ordem_temporadas, ordered=True)
-df_radar = df_radar.sort_values('season')
-
-fig_radar = go.Figure()
-
-fig_radar.add_trace(go.Scatterpolar(
-    r=df_radar['avg_purchase'],
-    theta=df_radar['season'],
-    fill='toself',
-    name='Média Compras (USD)'
-))
-
-fig_radar.add_trace(go.Scatterpolar(
-    r=df_radar['avg_review'],
-    theta=df_radar['season'],
-    fill='toself',
-    name='Média Avaliações',
-    fillcolor='rgba(0, 128, 0, 0.3)',
-    line_color='green'
-))
-
-fig_radar.update_layout(
-    polar=dict(
-        radialaxis=dict(
-            visible=True,
-            range=[0, max(df_radar[['avg_purchase', 'avg_review']].max()) * 1.1]
-        )
-    ),
-    showlegend=True
-)
+@figuraMemorizada('dashboard.temporadas')
+def figura_temporadas():
+    df_radar = indicadores.temporadas
+
+    fig_radar = go.Figure()
+
+    fig_radar.add_trace(go.Scatterpolar(
+        r=df_radar['avg_purchase'],
+        theta=df_radar['season'],
+        fill='toself',
+        name='Média Compras (USD)'
+    ))
+
+    fig_radar.add_trace(go.Scatterpolar(
+        r=df_radar['avg_review'],
+        theta=df_radar['season'],
+        fill='toself',
+        name='Média Avaliações',
+        fillcolor='rgba(0, 128, 0, 0.3)',
+        line_color='green'
+    ))
+
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, max(df_radar[['avg_purchase', 'avg_review']].max()) * 1.1]
+            )
+        ),
+        showlegend=True
+    )
+    return fig_radar
+
 #-------------------------------------TREEMAP-----------------------------------------
-query = """
-SELECT category, gender, SUM(purchase_amount_usd) AS total
-FROM shopping
-GROUP BY category, gender
-"""
-df = pd.read_sql_query(query, conn)
-
-fig = px.treemap(
-    df,
-    path=['category', 'gender'],
-    values='total',
-    color='total',
-    color_discrete_map={
-        'Male': 'blue',
-        'Female': 'pink',
-    }
-)
+@figuraMemorizada('dashboard.categoria_genero')
+def figura_categoria_genero():
+    df = indicadores.categoria_genero
+
+    fig = px.treemap(
+        df,
+        path=['category', 'gender'],
+        values='total',
+        color='total',
+        color_discrete_map={
+            'Male': 'blue',
+            'Female': 'pink',
+        }
+    )
+    return fig
+
 
 col5, col6 =st.columns(2)
 with col5.container(border = True):
     st.markdown(f"<h3 style='text-align: center;'>Treemap:<br> Compras por Categoria e Gênero<br>  </h3>", unsafe_allow_html=True)
-    st.plotly_chart(fig, use_container_width=True)
+    mostrarGrafico(figura_categoria_genero(), use_container_width=True)
 with col6.container(border = True):
     st.markdown(f"<h3 style='text-align: center;'>Radar Chart:<br> Vendas e Avaliações por Temporada<br></h3>", unsafe_allow_html=True)
-    st.plotly_chart(fig_radar, use_container_width=True)
+    mostrarGrafico(figura_temporadas(), use_container_width=True)
 #-------------------------------------HEATMAP-----------------------------------------
-query_heatmap = """
-SELECT age, purchase_amount_usd, review_rating
-FROM shopping
-"""
-df_corr = pd.read_sql_query(query_heatmap,conn)
-corr_matrix = df_corr.corr()
-
-corr_matrix = corr_matrix.rename(columns={
-    'age': 'Idade',
-    'purchase_amount_usd': 'Valor de Compra',
-    'review_rating': 'Avaliação'
-}, index={
-    'age': 'Idade',
-    'purchase_amount_usd': 'Valor de Compra',
-    'review_rating': 'Avaliação'
-})
-
-fig_heatmap = px.imshow(
-        corr_matrix,
-        text_auto = True,
-        color_continuous_scale = 'teal',
-        aspect = 'auto'
-)
+# Correlação a partir dos momentos somados na ingestão (data/Correlacao.py):
+# uma linha lida, nenhuma varredura de shopping
+@figuraMemorizada('dashboard.correlacao')
+def figura_correlacao():
+    corr_matrix = correlacao(['age', 'purchase_amount_usd', 'review_rating'])
+
+    corr_matrix = corr_matrix.rename(columns={
+        'age': 'Idade',
+        'purchase_amount_usd': 'Valor de Compra',
+        'review_rating': 'Avaliação'
+    }, index={
+        'age': 'Idade',
+        'purchase_amount_usd': 'Valor de Compra',
+        'review_rating': 'Avaliação'
+    })
+
+    fig_heatmap = px.imshow(
+            corr_matrix,
+            text_auto = True,
+            color_continuous_scale = 'teal',
+            aspect = 'auto'
+    )
+    return fig_heatmap
+
 st.subheader("", divider = True)
 with st.container(border=True):
     st.markdown(f"<h3 style='text-align: center;'>Heat Map:<br>Avaliação x Review x Valor<br></h3>", unsafe_allow_html=True)
-    st.plotly_chart(fig_heatmap, use_container_width=True)
+    mostrarGrafico(figura_correlacao(), use_container_width=True)
 
 
 #'teal'
-conn.close()
\ No newline at end of file
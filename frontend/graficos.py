@@ -0,0 +1,277 @@
+# Figuras Plotly memorizadas no cache de resultados (data/Cache.py), por
+# (gráfico, parâmetros, versão dos dados). Num acerto a página recebe a figura
+# pronta e só a entrega ao st.plotly_chart, sem refazer px.* nem a validação.
+# As figuras do cache são compartilhadas entre sessões: não devem ser alteradas
+# depois de construídas.
+import functools
+import threading
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from data.Cache import cache
+from data.Conexao import consultar, consultarLinha, versaoDados
+from data.Instrumentacao import medirFigura
+
+
+def _tamanho_propriedades(valor):
+    # Aproximação sem serializar: arrays pelo buffer, textos pelo comprimento,
+    # listas e dicionários pelos itens; basta para o orçamento do LRU
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, dict):
+        return sum(len(chave) + _tamanho_propriedades(item) for chave, item in valor.items())
+    if isinstance(valor, (list, tuple)):
+        return sum(_tamanho_propriedades(item) for item in valor)
+    if isinstance(valor, str):
+        return len(valor)
+    return 8
+
+
+def _tamanho_figura(fig):
+    # _data e _layout são os dicionários que o Plotly guarda por baixo dos objetos
+    # de traço e de layout: percorrê-los não valida nem copia nada. São privados:
+    # se uma versão do Plotly os remover, mede o JSON, mais caro mas estável
+    try:
+        return _tamanho_propriedades(fig._data) + _tamanho_propriedades(fig._layout)
+    except AttributeError:
+        return len(pio.to_json(fig, validate=False))
+
+
+def figura(grafico, params, construir):
+    chave = ('figura', grafico, params, versaoDados())
+    return cache.obter(chave, medirFigura(grafico, construir), medir=_tamanho_figura)
+
+
+def figuraMemorizada(grafico):
+    # Decorador: os argumentos da função viram os parâmetros da chave
+    def decorador(construir):
+        @functools.wraps(construir)
+        def obter(*params):
+            return figura(grafico, params, lambda: construir(*params))
+        return obter
+    return decorador
+
+
+# ====================================
+# Análise por Localização
+# ====================================
+def totaisLocalizacao():
+    # Linha 'total' de cada localização no cubo: lista de cidades da página
+    return consultar("SELECT location FROM cubo WHERE dimensao = 'total'")
+
+
+def cuboLocalizacao(cidade):
+    # Todas as medidas da cidade numa única busca pela chave do cubo
+    return consultar("SELECT * FROM cubo WHERE location = ?", (cidade,))
+
+
+def _fatia(cidade, dimensao):
+    cubo = cuboLocalizacao(cidade)
+    return cubo[cubo['dimensao'] == dimensao]
+
+
+@figuraMemorizada('localizacao.mapa_base')
+def figuraMapaBase():
+    # Igual para todas as cidades: construído uma vez por versão dos dados,
+    # a partir das 50 linhas de receita_estado gravadas na ingestão
+    revenue_by_state = consultar("SELECT state_code, total_revenue FROM receita_estado")
+
+    fig_map = px.choropleth(
+        revenue_by_state,
+        locations='state_code',
+        locationmode='USA-states',
+        color='total_revenue',
+        scope='usa',
+        title=' ',
+        labels={'total_revenue': 'Receita (USD)'},
+        color_continuous_scale='Blues'
+    )
+    fig_map.update_traces(
+        marker_line_width=1,
+        marker_line_color='gray',
+        selector=dict(type='choropleth')
+    )
+    fig_map.update_layout(title_x=0.35)
+    return fig_map
+
+
+@figuraMemorizada('localizacao.mapa')
+def figuraMapa(cidade):
+    # Por cidade, só o contorno vermelho é novo; o mapa base vem do cache
+    fig_map = figuraMapaBase()
+    linha = consultarLinha("SELECT state_code FROM estados WHERE location = ?", (cidade,))
+    if linha is None:
+        return fig_map
+
+    # Cópia: a figura base é compartilhada
+    fig_map = go.Figure(fig_map)
+    fig_map.add_trace(
+        go.Choropleth(
+            locations=[linha[0]],
+            z=[1],  # Valor fictício para cor
+            locationmode='USA-states',
+            colorscale=[[0, 'rgba(0,0,0,0)'], [1, 'rgba(0,0,0,0)']],
+            marker_line_width=3,
+            marker_line_color='red',
+            showscale=False,
+            hoverinfo='skip'
+        )
+    )
+    return fig_map
+
+
+@figuraMemorizada('localizacao.categorias')
+def figuraCategorias(cidade):
+    df = (
+        _fatia(cidade, 'category')
+        .rename(columns={'valor': 'category', 'soma_valor': 'total_amount'})
+        .sort_values('total_amount', ascending=False)
+    )
+
+    fig = px.bar(df,
+                x="category",
+                y='total_amount',
+                color='category',
+                title=' ')
+    fig.update_layout(title_x=0.35)
+    return fig
+
+
+@figuraMemorizada('localizacao.pagamentos')
+def figuraPagamentos(cidade):
+    df = _fatia(cidade, 'payment_method').rename(columns={'valor': 'payment_method', 'n': 'quantidade'})
+
+    fig = px.pie(df,
+                values='quantidade',
+                names='payment_method',
+                title=' ')
+    fig.update_layout(title_x=0.30)
+    return fig
+
+
+@figuraMemorizada('localizacao.generos')
+def figuraGeneros(cidade):
+    df = _fatia(cidade, 'gender').rename(columns={'valor': 'gender', 'n': 'quantidade'})
+
+    fig = px.bar(df,
+                    x="quantidade",
+                    y='gender',
+                    color="gender",
+                    title=' ')
+    fig.update_layout(title_x=0.30)
+    return fig
+
+
+@figuraMemorizada('localizacao.descontos')
+def figuraDescontos(cidade):
+    df_discount = _fatia(cidade, 'discount_applied')
+    df_discount = pd.DataFrame({
+        'Desconto': df_discount['valor'],
+        'Valor Médio': df_discount['soma_valor'] / df_discount['n'],
+        'Total Compras': df_discount['n'],
+    })
+
+    fig1 = px.bar(df_discount,
+                    x='Total Compras',
+                    y='Desconto',
+                    title=' ',
+                    color='Desconto',
+                    color_continuous_scale='Blues'
+                )
+    fig1.update_layout(title_x=0.30)
+    return fig1
+
+
+def _estacoes(cidade):
+    df_season = _fatia(cidade, 'season')[['valor', 'soma_valor', 'n']]
+    df_season.columns = ['Estação', 'Vendas Totais', 'Total Compras']
+    return df_season
+
+
+@figuraMemorizada('localizacao.vendas_estacao')
+def figuraVendasEstacao(cidade):
+    fig1 = px.bar(_estacoes(cidade),
+                 x='Estação',
+                 y='Vendas Totais',
+                 title='Vendas Totais por Estação',
+                 color='Estação',
+                 color_continuous_scale='Blues'
+                 )
+    fig1.update_layout(title_x=0.3)
+    return fig1
+
+
+@figuraMemorizada('localizacao.volume_estacao')
+def figuraVolumeEstacao(cidade):
+    fig2 = px.line(_estacoes(cidade),
+                    x='Estação',
+                    y='Total Compras',
+                    title='Volume de Compras por Estação',
+                    markers=True)
+    fig2.update_layout(title_x=0.3)
+    return fig2
+
+
+@figuraMemorizada('localizacao.tamanhos')
+def figuraTamanhos(cidade):
+    df_size = _fatia(cidade, 'size')[['valor', 'n']]
+    df_size.columns = ['Tamanho', 'Total']
+
+    fig_size = px.bar(df_size,
+                        x='Tamanho',
+                        y='Total',
+                        title='Preferência de Tamanhos',
+                        color='Tamanho')
+    fig_size.update_layout(title_x=0.38)
+    return fig_size
+
+
+@figuraMemorizada('localizacao.cores')
+def figuraCores(cidade):
+    df_color = _fatia(cidade, 'color')[['valor', 'n']]
+    df_color.columns = ['Cor', 'Total']
+
+    fig_color = px.bar(df_color,
+                        x='Cor',
+                        y='Total',
+                        title='Preferência de Cores',
+                        color='Cor',
+                        color_continuous_scale='Blues'
+                       )
+    fig_color.update_layout(title_x=0.38)
+    return fig_color
+
+
+FIGURAS_LOCALIZACAO = [
+    figuraMapa, figuraCategorias, figuraPagamentos, figuraGeneros, figuraDescontos,
+    figuraVendasEstacao, figuraVolumeEstacao, figuraTamanhos, figuraCores,
+]
+
+
+# ====================================
+# Aquecimento depois da ingestão
+# ====================================
+_aquecida = None
+_aquecer_lock = threading.Lock()
+
+
+def _aquecer_localizacao():
+    for cidade in sorted(totaisLocalizacao()['location'].dropna()):
+        for construir in FIGURAS_LOCALIZACAO:
+            construir(cidade)
+
+
+def aquecerFiguras():
+    # Uma vez por versão dos dados, constrói em segundo plano as figuras de
+    # todas as cidades; a primeira seleção de cada uma já encontra o cache pronto
+    global _aquecida
+    versao = versaoDados()
+    with _aquecer_lock:
+        if _aquecida == versao:
+            return
+        _aquecida = versao
+    threading.Thread(target=_aquecer_localizacao, daemon=True).start()
@@ -2,7 +2,6 @@
 # IMPORTAÇÕES
 # ====================================
 import streamlit as st
-import sqlite3
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -10,13 +9,20 @@ import plotly.graph_objects as go
 # ====================================
 # CONEXÃO COM BANCO DE DADOS
 # ====================================
-conn = sqlite3.connect("data\\shopping.db")
-cursor = conn.cursor()
+from data.Esquema import FREQUENCIA_ANUAL
+from data.Segmentos import compararSegmentos
+from frontend.componentes import FUNDO_VERDE, Kpi, mostrarGrafico, painelKpis
 
 # ====================================
 # LEITURA DA BASE DE DADOS
 # ====================================
-df = pd.read_sql_query("SELECT * FROM shopping", conn)
+# Motor de segmentos (data/Segmentos.py): as células de cada divisão vêm da
+# tabela segmentos, materializada na ingestão; a página não carrega shopping
+desconto = compararSegmentos('desconto', ('season', 'category'))
+assinatura = compararSegmentos(
+    'assinatura', ('frequency_of_purchases', 'preferred_payment_method'), contar_clientes=False
+)
+resumo_desconto = desconto.resumo().reindex([True, False])
 
 # ====================================
 # TÍTULO DA PÁGINA
@@ -26,21 +32,26 @@ st.markdown(f"<h1 style='text-align: center;'>📊 Análise de Promoções <br>
 # ====================================
 # COLUNAS PARA KPIs
 # ====================================
-cl1c, cl2c = st.columns(2)
-cl1, cl2, cl3, cl4 = st.columns(4)
+# Lugar reservado: o painel é renderizado no fim, quando os valores estão prontos
+painel_kpis = st.empty()
 
 # ====================================
 # GRÁFICO: Frequência de Compras por Status de Assinatura
 # ====================================
 st.subheader(" ", divider=True)
 
-frequency_by_subscription = df.groupby(['subscription_status', 'frequency_of_purchases']).size().reset_index(name='count')
-frequency_by_subscription['proportion'] = frequency_by_subscription.groupby('subscription_status')['count'].transform(lambda x: x / x.sum())
-frequency_by_subscription['subscription_status'] = frequency_by_subscription['subscription_status'].map({'Yes': 'Com Assinatura', 'No': 'Sem Assinatura'})
-
-frequency_order = ['Weekly', 'Bi-Weekly', 'Fortnightly', 'Monthly', 'Quarterly', 'Every 3 months', 'Annually']
-frequency_by_subscription['frequency_of_purchases'] = pd.Categorical(frequency_by_subscription['frequency_of_purchases'], categories=frequency_order, ordered=True)
-frequency_by_subscription = frequency_by_subscription.sort_values('frequency_of_purchases')
+frequencia = assinatura.por('frequency_of_purchases')
+
+frequency_order = [frequencia_ for frequencia_ in FREQUENCIA_ANUAL if frequencia_ in frequencia.index]
+frequency_by_subscription = (
+    (frequencia / frequencia.sum())
+    .loc[frequency_order]
+    .rename(columns={True: 'Com Assinatura', False: 'Sem Assinatura'})
+    .rename_axis(index='frequency_of_purchases', columns='subscription_status')
+    .stack()
+    .rename('proportion')
+    .reset_index()
+)
 
 fig_frequency = px.bar(
     frequency_by_subscription,
@@ -59,21 +70,19 @@ fig_frequency.update_layout(yaxis_tickformat='.1%')
 fig_frequency.update_traces(textposition='outside')
 with st.container(border=True):
     st.markdown(f"<h3 style='text-align: center;'>Frequência de Compras por Status de Assinatura</h3>", unsafe_allow_html=True)
-    st.plotly_chart(fig_frequency)
+    mostrarGrafico(fig_frequency)
 
 # ====================================
 # KPIs: Ticket Médio e Clientes
 # ====================================
-discount_applied_yes = df[df['discount_applied'] == 'Yes']
-discount_applied_no = df[df['discount_applied'] == 'No']
+com_desconto = resumo_desconto.loc[True]
+sem_desconto = resumo_desconto.loc[False]
 
-ticket_medio_yes = discount_applied_yes['purchase_amount_usd'].mean().round(2)
-ticket_mediono = discount_applied_no['purchase_amount_usd'].mean().round(2)
+ticket_medio_yes = round(com_desconto['ticket_medio'], 2)
+ticket_mediono = round(sem_desconto['ticket_medio'], 2)
 
-count_clientes_yes = discount_applied_yes['customer_id'].nunique()
-count_clientes_no = discount_applied_no['customer_id'].nunique()
-df['ticketmediono'] = ticket_mediono
-df['ticketmedioyes'] = ticket_medio_yes
+count_clientes_yes = int(com_desconto['clientes'])
+count_clientes_no = int(sem_desconto['clientes'])
 
 diferenca_percentual_ticket_medio = 0
 if ticket_mediono != 0:
@@ -86,15 +95,15 @@ st.subheader(' ', divider=True)
 # ====================================
 pcol1, pcol2 = st.columns(2)
 
-discount_applied_with_subscription = df[df['subscription_status'] == 'Yes']
-discount_applied_without_subscription = df[df['subscription_status'] == 'No']
-
-payment_with_subscription_discount = discount_applied_with_subscription['preferred_payment_method'].value_counts().rename('Com Desconto e Assinatura')
-payment_without_subscription_no_discount = discount_applied_without_subscription['preferred_payment_method'].value_counts().rename('Sem Desconto e Sem Assinatura')
+pagamentos = assinatura.por('preferred_payment_method')
 
-payment_df = pd.concat([payment_with_subscription_discount, payment_without_subscription_no_discount], axis=1).fillna(0)
-payment_df.index.name = 'Metodo de Pagamento'
-payment_df = payment_df.reset_index()
+payment_df = (
+    pagamentos
+    .sort_values(True, ascending=False, kind='stable')
+    .rename(columns={True: 'Com Desconto e Assinatura', False: 'Sem Desconto e Sem Assinatura'})
+    .rename_axis(index='Metodo de Pagamento', columns=None)
+    .reset_index()
+)
 
 payment_melted = payment_df.melt(
     id_vars='Metodo de Pagamento',
@@ -104,7 +113,7 @@ payment_melted = payment_df.melt(
 )
 
 payment_pct = payment_melted.copy()
-payment_pct['Total'] = payment_pct.groupby('Metodo de Pagamento')['Quantidade'].transform('sum')
+payment_pct['Total'] = payment_pct.groupby('Metodo de Pagamento', observed=True)['Quantidade'].transform('sum')
 payment_pct['Proporcao'] = payment_pct['Quantidade'] / payment_pct['Total']
 
 fig = px.bar(
@@ -119,10 +128,10 @@ fig = px.bar(
 
 with pcol2.container(border=True):
     st.markdown(f"<h3 style='text-align: center;'>Proporção de Grupos por Método de Pagamento</h3>", unsafe_allow_html=True)
-    st.plotly_chart(fig)
+    mostrarGrafico(fig)
 
 # Gráfico de pizza: distribuição geral
-pagamento_geral = df['preferred_payment_method'].value_counts().reset_index()
+pagamento_geral = pagamentos.sum(axis=1).sort_values(ascending=False).reset_index()
 pagamento_geral.columns = ['Metodo de Pagamento', 'Quantidade']
 
 fig_pizza_pagamento = px.pie(
@@ -136,7 +145,7 @@ fig_pizza_pagamento = px.pie(
 
 with pcol1.container(border=True):
     st.markdown(f"<h3 style='text-align: center;'>Distribuição Geral dos Métodos de Pagamento</h3>", unsafe_allow_html=True)    
-    st.plotly_chart(fig_pizza_pagamento)
+    mostrarGrafico(fig_pizza_pagamento)
 
 st.subheader(' ', divider=True)
 
@@ -149,10 +158,12 @@ st.subheader(' ', divider=True)
 
 st.markdown(f"<h3 style='text-align: center;'>Frequência e Proporção de Cupons por Temporada</h3>", unsafe_allow_html=True)
 
-season_yes = discount_applied_yes.groupby('season').size().rename('com_desconto')
-season_no = discount_applied_no.groupby('season').size().rename('sem_desconto')
-
-season_data = pd.concat([season_yes, season_no], axis=1).fillna(0)
+season_data = (
+    desconto.por('season')
+    .rename(columns={True: 'com_desconto', False: 'sem_desconto'})
+    .reindex(columns=['com_desconto', 'sem_desconto'], fill_value=0)
+    .rename_axis(columns=None)
+)
 season_data['total'] = season_data['com_desconto'] + season_data['sem_desconto']
 season_data['proporcao_com_desconto'] = season_data['com_desconto'] / season_data['total']
 
@@ -169,13 +180,13 @@ fig = px.pie(
 
 with cl1g.container(border=True):
     st.markdown(f"<h3 style='text-align: center;'>Proporção de Uso de Cupons por Temporada</h3>", unsafe_allow_html=True)
-    st.plotly_chart(fig)      
+    mostrarGrafico(fig)      
 
 # ====================================
 # GRÁFICO: Porcentagem de Uso de Cupons
 # ====================================
-cupom_counts = df['discount_applied'].value_counts(normalize=True) * 100
-cupom_counts.index = cupom_counts.index.map({'Yes': 'Com Cupom', 'No': 'Sem Cupom'})
+cupom_counts = (resumo_desconto['n'] / resumo_desconto['n'].sum() * 100).sort_values(ascending=False)
+cupom_counts.index = cupom_counts.index.map({True: 'Com Cupom', False: 'Sem Cupom'})
 cupom_df = cupom_counts.reset_index()
 cupom_df.columns = ['Uso de Cupom', 'Porcentagem']
 
@@ -193,16 +204,17 @@ fig.update_layout(yaxis_tickformat='.1f%', showlegend=False)
 
 with cl2g.container(border=True):
     st.markdown(f"<h3 style='text-align: center;'>Porcentagem de Clientes que Usam Cupom vs. Não Usam</h3>", unsafe_allow_html=True)
-    st.plotly_chart(fig)   
+    mostrarGrafico(fig)   
 
 # ====================================
 # GRÁFICO: Satisfação por Categoria
 # ====================================
-media_aval_yes = discount_applied_yes['review_rating'].mean().round(2)
-media_aval_no = discount_applied_no['review_rating'].mean().round(2)
+media_aval_yes = round(com_desconto['media_avaliacao'], 2)
+media_aval_no = round(sem_desconto['media_avaliacao'], 2)
 
-aval_yes = discount_applied_yes.groupby('category')['review_rating'].mean().round(2)
-aval_no = discount_applied_no.groupby('category')['review_rating'].mean().round(2)
+avaliacao_categoria = desconto.mediaPor('category', 'soma_avaliacao').round(2)
+aval_yes = avaliacao_categoria.get(True, pd.Series(dtype=float))
+aval_no = avaliacao_categoria.get(False, pd.Series(dtype=float))
 
 categorias = sorted(set(aval_yes.index).union(set(aval_no.index)))
 valores_yes = [aval_yes.get(cat, 0) for cat in categorias]
@@ -211,60 +223,29 @@ valores_no = [aval_no.get(cat, 0) for cat in categorias]
 # ====================================
 # KPIs: Compras Anteriores
 # ====================================
-compra_anter_yes = discount_applied_yes['previous_purchases'].mean().round(1)
-compra_anter_no = discount_applied_no['previous_purchases'].mean().round(1)
+compra_anter_yes = round(com_desconto['media_compras_anteriores'], 1)
+compra_anter_no = round(sem_desconto['media_compras_anteriores'], 1)
 
 # ====================================
 # EXIBIÇÃO DOS KPIs
 # ====================================
-# Função auxiliar para centralizar KPIs
-def kpi_centered(label, value, delta=None, help=None, gradient_css = None):
-    # Determina a cor do delta: verde se positivo, vermelho se negativo, cinza se None ou vazio
-  
-    st.markdown(
-        f"""
-        <div style="
-            background: {gradient_css};
-            border-radius: 12px;
-            padding: 16px;
-            text-align: center;
-            box-shadow: 2px 2px 6px rgba(0,0,0,0.05);
-            background-color: #f9f9f9;
-            margin-bottom: 20px;  /* Espaçamento vertical adicionado */
-        ">
-            <div style="font-size: 16px; font-weight: 500; color: #333;">{label}</div>
-            <div style="font-size: 28px; font-weight: bold; margin-top: 5px;">{value}</div>
-            {f'<div style="font-size: 12px; color: gray; margin-top: 4px;">{help}</div>' if (help is not None and str(help).strip() != '') else ''}
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-
-# KPIs principais
-with cl1c:
-    kpi_centered(
-        "Ticket Médio com Desconto",
-        f"US$ {ticket_medio_yes:.2f}",
-        delta=f"{diferenca_percentual_ticket_medio:.1f}%",
-        help=f"{count_clientes_yes} clientes únicos",
-        gradient_css="linear-gradient(to top, #d0f0c0, #b0e57c)"
-    )
-
-with cl2c:
-    kpi_centered(
-        "Ticket Médio sem Desconto",
-        f"US$ {ticket_mediono:.2f}",
-        delta=None,
-        help=f"{count_clientes_no} clientes únicos",
-        gradient_css="linear-gradient(to top, #d0f0c0, #b0e57c)"
-    )
-
-# KPIs adicionais
-with cl1:
-    kpi_centered("Média de Avaliação (com desconto)", f"{float(media_aval_yes):.2f}", gradient_css="linear-gradient(to bottom, #4d94d4, #cceeff)")
-with cl2:
-    kpi_centered("Compras Anteriores (com desconto)", f"{float(compra_anter_yes):.1f}",gradient_css="linear-gradient(to bottom, #4d94d4, #cceeff)")
-with cl3:
-    kpi_centered("Média de Avaliação (sem desconto)", f"{float(media_aval_no):.2f}",gradient_css="linear-gradient(to bottom, #4d94d4, #cceeff)")
-with cl4:
-    kpi_centered("Compras Anteriores (sem desconto)", f"{float(compra_anter_no):.1f}",gradient_css="linear-gradient(to bottom, #4d94d4, #cceeff)")
+painelKpis(
+    [
+        Kpi(
+            "Ticket Médio com Desconto", ticket_medio_yes, "US$ {:.2f}", FUNDO_VERDE,
+            delta=diferenca_percentual_ticket_medio,
+            ajuda=f"{count_clientes_yes} clientes únicos",
+        ),
+        Kpi(
+            "Ticket Médio sem Desconto", ticket_mediono, "US$ {:.2f}", FUNDO_VERDE,
+            ajuda=f"{count_clientes_no} clientes únicos",
+        ),
+    ],
+    [
+        Kpi("Média de Avaliação (com desconto)", float(media_aval_yes), "{:.2f}"),
+        Kpi("Compras Anteriores (com desconto)", float(compra_anter_yes), "{:.1f}"),
+        Kpi("Média de Avaliação (sem desconto)", float(media_aval_no), "{:.2f}"),
+        Kpi("Compras Anteriores (sem desconto)", float(compra_anter_no), "{:.1f}"),
+    ],
+    destino=painel_kpis,
+)
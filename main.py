@@ -1,5 +1,8 @@
 import streamlit as st
-from data.CriacaoDB import criarTable
+from data import Instrumentacao
+from data.Ingestao import aguardarPrimeiraVersao
+from frontend.componentes import painelDesempenho
+from frontend.graficos import aquecerFiguras
 from streamlit import config as _config
 
 _config.set_option("theme.base", "light")
@@ -9,7 +12,6 @@ _config.set_option("theme.secondaryBackgroundColor", "#f0f2f6")
 _config.set_option("theme.textColor", "#31333F")
 
 def main():
-    criarTable()
     st.set_page_config(
         page_title="Customer Shopping",
         page_icon="💸",
@@ -17,6 +19,12 @@ def main():
         initial_sidebar_state="expanded",
     )
 
+    # A ingestão roda em segundo plano (data/Ingestao.py); só a primeira carga,
+    # sem nenhuma versão do banco publicada, segura a página
+    with st.spinner("Carregando os dados..."):
+        aguardarPrimeiraVersao()
+    aquecerFiguras()
+
     dashboard_page = st.Page("frontend/dashboard.py", title="Dashboard", icon="📊", url_path="/dashboard")
     localizacao = st.Page("frontend/localizacao.py", title="Análise por Localização", icon="🌎", url_path="/localizacao") 
     consumidor = st.Page("frontend/consumidor.py", title="Perfil do Consumidor", icon="👤", url_path="/consumidor") 
@@ -30,8 +38,13 @@ def main():
             consumidor,
             promocoes
         ])
-    
-    pg.run()
+
+    # Com SHOPPING_INSTRUMENTACAO ligada, o rerun da página é medido e o painel
+    # de desempenho aparece na barra lateral (data/Instrumentacao.py)
+    with Instrumentacao.medirRerun(pg.title):
+        pg.run()
+    if Instrumentacao.ATIVA:
+        painelDesempenho()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file